@@ -1,17 +1,18 @@
 import os
 import sys
 import json
+from functools import lru_cache
 
 # Ensure the project root is on the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from langchain_groq import ChatGroq
 from langchain.agents import initialize_agent, AgentType
 from langchain.memory import ConversationBufferMemory
 from langchain.tools import tool
+from langchain_core.prompts import MessagesPlaceholder
+from langchain_core.messages.utils import count_tokens_approximately
 from dotenv import load_dotenv
 
-from services.analytics import AnalyticsService
 from tools.fuliza_usage_tool import get_fuliza_usage
 from tools.spending_by_category_tool import get_spending_by_category
 from tools.spending_tool import get_spending_summary
@@ -19,35 +20,84 @@ from tools.top_transactions_tool import get_top_transactions
 
 load_dotenv()
 
-# ── Create a shared analytics instance ───────────────────────────────────────
-analytics = AnalyticsService()
+# Conversation history kept in the prompt, in (approximate) tokens
+CHAT_MEMORY_MAX_TOKENS = int(os.getenv("CHAT_MEMORY_MAX_TOKENS", "2000"))
+
+# Chat model behind the agents: "groq", or "fake" for the offline scripted model
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+
+
+# ── MEMORY ───────────────────────────────────────────────────────────────────
+
+class TokenWindowMemory(ConversationBufferMemory):
+    """
+    ConversationBufferMemory that forgets the oldest exchanges once the
+    history passes max_token_limit, so prompts (and latency) stop growing
+    with the conversation. The most recent exchange is always kept.
+    """
+
+    max_token_limit: int = CHAT_MEMORY_MAX_TOKENS
+
+    def save_context(self, inputs, outputs):
+        super().save_context(inputs, outputs)
+        messages = self.chat_memory.messages
+        # Drop whole question/answer pairs, oldest first
+        while len(messages) > 2 and count_tokens_approximately(messages) > self.max_token_limit:
+            del messages[:2]
+
 
 # ── BUILD THE AGENT ──────────────────────────────────────────────────────────
 
-def build_finance_agent():
+def build_llm(backend: str = LLM_BACKEND):
+    """
+    The chat model for backend. Both stream, so replies can be relayed
+    token by token.
+    - groq : Groq LLaMA 3.3 70B (needs GROQ_API_KEY)
+    - fake : agents.fake_llm.ScriptedChatModel, offline and deterministic
+    """
+    if backend == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model="llama-3.3-70b-versatile",
+            temperature=0.3,
+            max_tokens=4000,
+            streaming=True,
+            api_key=os.getenv("GROQ_API_KEY")
+        )
+    if backend == "fake":
+        from agents.fake_llm import ScriptedChatModel
+
+        return ScriptedChatModel()
+    raise ValueError(f"Unknown LLM_BACKEND {backend!r}; expected 'groq' or 'fake'.")
+
+
+@lru_cache(maxsize=1)
+def shared_llm():
+    """One chat model client (LLM_BACKEND) for every agent."""
+    return build_llm()
+
+
+def build_finance_agent(llm=None, memory_max_tokens: int = CHAT_MEMORY_MAX_TOKENS):
     """
     Build the agentic financial advisor.
 
     Agent architecture:
-    - BRAIN  : Groq LLaMA 3.3 70B
-    - MEMORY : ConversationBufferMemory (tracks full session)
+    - BRAIN  : shared_llm() (Groq LLaMA 3.3 70B by default) unless llm is given
+    - MEMORY : TokenWindowMemory (the last memory_max_tokens of this conversation)
     - TOOLS  : get_spending_summary, get_spending_by_category,
                get_top_transactions, get_fuliza_usage
     """
 
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0.3,
-        max_tokens=4000,
-        api_key=os.getenv("GROQ_API_KEY")
-    )
+    llm = llm if llm is not None else shared_llm()
 
     tools = [get_spending_summary, get_spending_by_category,
              get_top_transactions, get_fuliza_usage]
 
-    memory = ConversationBufferMemory(
+    memory = TokenWindowMemory(
         memory_key="chat_history",
-        return_messages=True
+        return_messages=True,
+        max_token_limit=memory_max_tokens,
     )
 
     system_message = """You are an intelligent M-PESA Financial Advisor Agent.
@@ -80,7 +130,11 @@ def build_finance_agent():
         handle_parsing_errors=True,
         max_iterations=5,
         agent_kwargs={
-            "prefix": system_message
+            "prefix": system_message,
+            # The structured-chat prompt has no history slot of its own;
+            # without this the memory is saved but never shown to the model
+            "memory_prompts": [MessagesPlaceholder(variable_name="chat_history")],
+            "input_variables": ["input", "agent_scratchpad", "chat_history"],
         }
     )
 
@@ -0,0 +1,102 @@
+"""
+Scripted chat model
+===================
+An offline, deterministic stand-in for the Groq model, for benchmarks and
+for running the app without network access (LLM_BACKEND=fake).
+
+ScriptedChatModel replies with its script one entry per call, cycling
+around, so an agent run follows exactly the tool calls written in it.
+tool_call() and final_answer() write entries in the structured-chat format
+the finance agent parses:
+
+    model = ScriptedChatModel(script=[
+        tool_call("get_spending_summary"),
+        final_answer("You spent KES 1,200 this month."),
+    ])
+"""
+
+import json
+import re
+import threading
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel, generate_from_stream
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Words and the whitespace after them: the pieces a streamed reply arrives in
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def tool_call(name: str, query: str = "") -> str:
+    """A reply asking the agent to run tool name."""
+    blob = json.dumps({"action": name, "action_input": {"query": query}}, indent=2)
+    return f"Thought: I need {name} for this.\nAction:\n```\n{blob}\n```"
+
+
+def final_answer(text: str) -> str:
+    """A reply ending the agent run with text as the answer."""
+    blob = json.dumps({"action": "Final Answer", "action_input": text}, indent=2)
+    return f"Thought: I can answer now.\nAction:\n```\n{blob}\n```"
+
+
+DEFAULT_SCRIPT = [
+    tool_call("get_spending_summary"),
+    final_answer(
+        "This is a scripted reply from the offline model (LLM_BACKEND=fake). "
+        "Set LLM_BACKEND=groq and GROQ_API_KEY for real answers."
+    ),
+]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays script, one entry per call. Thread-safe."""
+
+    script: List[str] = DEFAULT_SCRIPT
+    streaming: bool = True
+
+    _position: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def reset(self):
+        """Start the script from the top again."""
+        with self._lock:
+            self._position = 0
+
+    def _next_reply(self) -> str:
+        with self._lock:
+            reply = self.script[self._position % len(self.script)]
+            self._position += 1
+        return reply
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for token in _TOKEN_RE.findall(self._next_reply()):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Like ChatGroq(streaming=True): stream even for invoke(), so the
+        # token callbacks fire exactly as they do in production
+        if self.streaming:
+            return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._next_reply()))])
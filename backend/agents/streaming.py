@@ -0,0 +1,99 @@
+"""
+Streaming agent replies
+=======================
+The finance agent answers with a structured-chat JSON blob, e.g.
+
+    {"action": "Final Answer", "action_input": "You spent KES 1,200 on ..."}
+
+ChatStreamHandler watches the tokens of every LLM call and relays only the
+text of the final answer's action_input as it is generated, plus the names
+of tools the agent calls along the way. The agent's own parsed output is
+still the authoritative answer once the run ends.
+"""
+
+import json
+import re
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+_FINAL_ANSWER_RE = re.compile(r'"action"\s*:\s*"Final Answer"\s*,\s*"action_input"\s*:\s*"')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _JsonStringReader:
+    """Decodes a JSON string literal that arrives in pieces, stopping at its closing quote."""
+
+    def __init__(self):
+        self.pending = ""
+        self.closed = False
+
+    def feed(self, text: str) -> str:
+        self.pending += text
+        out, i = [], 0
+        while i < len(self.pending) and not self.closed:
+            char = self.pending[i]
+            if char == '"':
+                self.closed = True
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # Escape sequences may be split across tokens: wait for the rest
+            if i + 1 >= len(self.pending):
+                break
+            code = self.pending[i + 1]
+            if code == "u":
+                if i + 6 > len(self.pending):
+                    break
+                try:
+                    out.append(json.loads(f'"{self.pending[i:i + 6]}"'))
+                except ValueError:
+                    out.append(self.pending[i:i + 6])
+                i += 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+        self.pending = self.pending[i:]
+        return "".join(out)
+
+
+class ChatStreamHandler(BaseCallbackHandler):
+    """
+    Callback handler passing streamed events to emit(event, data):
+    ("tool", {"name": ...}) when the agent calls a tool and
+    ("token", {"text": ...}) for each piece of the final answer.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+        self._buffers = {}
+        self._readers = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._buffers[run_id] = ""
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._buffers[run_id] = ""
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        reader = self._readers.get(run_id)
+        if reader is None:
+            buffer = self._buffers.get(run_id, "") + token
+            self._buffers[run_id] = buffer
+            match = _FINAL_ANSWER_RE.search(buffer)
+            if match is None:
+                return
+            reader = self._readers[run_id] = _JsonStringReader()
+            token = buffer[match.end():]
+        if not reader.closed:
+            text = reader.feed(token)
+            if text:
+                self.emit("token", {"text": text})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._buffers.pop(run_id, None)
+        self._readers.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.emit("tool", {"name": (serialized or {}).get("name")})
@@ -4,31 +4,42 @@ MPESA Finance Tracker — FastAPI REST API
 Run:  uvicorn api:app --reload --port 8000
 """
 
+import asyncio
+import json
 import os
 import tempfile
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, Query, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, Query, HTTPException, Form, Request, Response, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from database.session import engine
+from database.session import engine, SessionLocal, get_db, dispose_async_engine, run_with_session
 from database.models import Base, Transaction
-from database.repository import TransactionRepository
-from services.analytics import AnalyticsService
-from helpers.file_loader import load_statements, clean_mpesa_text, consolidate_fuliza
-from agents.analysing_agent import build_finance_agent
-
-# ── Lifespan: create tables + build agent once ────────────────────────────────
-_agent = None
-
-
+from database import generation, rollups
+from database.tenancy import DEFAULT_USER_ID, TRUST_USER_ID_HEADER, USER_ID_HEADER, validate_user_id
+from database.repository import AsyncTransactionRepository
+from services.analytics import ANALYTICS_BACKEND, AsyncAnalyticsService, series_args
+from services.agent_pool import agent_pool
+from services.ingest_jobs import ingest_jobs
+from services.response_cache import response_cache
+
+
+# ── Lifespan: create tables, backfill rollups ────────────────────────────────
+# Chat agents are built per session by agent_pool, on first use. Heavy
+# modules (LangChain, pandas, pypdf) are imported by the endpoints that need
+# them, inside the threadpool, so workers start fast and a cold import never
+# blocks the event loop.
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _agent
     Base.metadata.create_all(engine)
-    _agent = build_finance_agent()
+    with SessionLocal() as session:
+        rollups.ensure_built(session)
     yield
+    ingest_jobs.shutdown()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -38,10 +49,13 @@ app = FastAPI(
 )
 
 # ── CORS — allow the React frontend ──────────────────────────────────────────
+# Comma-separated origins; credentials are only allowed for a named list
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # tighten in production
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -50,10 +64,64 @@ app.add_middleware(
 # ── Schemas ───────────────────────────────────────────────────────────────────
 class ChatRequest(BaseModel):
     message: str
+    session_id: str | None = None  # omit to start a new conversation
 
 
 class ChatResponse(BaseModel):
     answer: str
+    session_id: str
+
+
+# ── Tenant ───────────────────────────────────────────────────────────────────
+def get_user_id(
+    user_header: str | None = Header(None, alias=USER_ID_HEADER,
+                                     description="User whose data to use; set by the auth proxy"),
+) -> str:
+    """
+    FastAPI dependency: the user a request acts for. Every endpoint reads
+    and writes only this user's data. Without the header it is
+    DEFAULT_USER_ID; the header itself is refused unless
+    TRUST_USER_ID_HEADER says a proxy sets it (see database/tenancy.py).
+    """
+    if user_header is None:
+        return DEFAULT_USER_ID
+    if not TRUST_USER_ID_HEADER:
+        raise HTTPException(
+            status_code=403,
+            detail=f"{USER_ID_HEADER} is only accepted from a trusted proxy (TRUST_USER_ID_HEADER).",
+        )
+    try:
+        return validate_user_id(user_header)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ── Cached analytics responses ───────────────────────────────────────────────
+async def _generation(session, user_id: str) -> int:
+    return await run_with_session(session, generation.current, user_id)
+
+
+async def _cached(request: Request, response: Response, session, endpoint: str, params: dict, user_id: str,
+                  compute):
+    """
+    Serve user_id's analytics result through the response cache. The ETag
+    depends only on the endpoint, params, user and the user's data
+    generation, so a matching If-None-Match gets a 304 after one indexed
+    read (the generation, on the request's session) and no analytics.
+    compute is awaited only on a cache miss.
+    """
+    params = {**params, "user_id": user_id}
+    gen = await _generation(session, user_id)
+    etag = response_cache.etag(endpoint, params, gen)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return await response_cache.get_or_compute_async(endpoint, params, gen, compute)
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -61,12 +129,21 @@ class ChatResponse(BaseModel):
 # ═════════════════════════════════════════════════════════════════════════════
 
 
-@app.post("/api/upload")
+def _count_pdf_pages(path: str, password: str | None) -> int:
+    from helpers.file_loader import count_pdf_pages
+    return count_pdf_pages(path, password)
+
+
+@app.post("/api/upload", status_code=202)
 async def upload_statement(
     file: UploadFile = File(...),
     password: str = Form(default=""),
+    user_id: str = Depends(get_user_id),
 ):
-    """Upload an M-PESA PDF or CSV statement and import transactions."""
+    """
+    Upload an M-PESA PDF or CSV statement and queue it for import.
+    Returns a job id right away; poll /api/jobs/{job_id} for progress.
+    """
     ext = os.path.splitext(file.filename or "")[1].lower()
     if ext not in (".pdf", ".csv"):
         raise HTTPException(status_code=400, detail="Only .pdf and .csv files are supported.")
@@ -77,29 +154,16 @@ async def upload_statement(
         tmp.write(content)
         tmp_path = tmp.name
 
+    # Check a PDF's password up front so the browser can prompt for it
+    pages_total = 0
     try:
-        raw = load_statements(tmp_path, password=password or None)
-        df = clean_mpesa_text(raw)
-        df = consolidate_fuliza(df)
-
-        repo = TransactionRepository()
-        before_count = len(repo.get_all())
-        repo.add_bulk(df)
-
-        after_count = len(repo.get_all())
-        imported = after_count - before_count
-        skipped = len(df) - imported
-        repo.close()
-
-        return {
-            "imported": imported,
-            "skipped": skipped,
-            "message": f"Successfully processed {file.filename}. "
-                       f"{imported} new transactions imported, {skipped} duplicates skipped.",
-        }
+        if ext == ".pdf":
+            pages_total = await run_in_threadpool(_count_pdf_pages, tmp_path, password or None)
     except ValueError as e:
+        os.unlink(tmp_path)
         raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
+        os.unlink(tmp_path)
         err_msg = str(e)
         if "not been decrypted" in err_msg or "encrypted" in err_msg.lower():
             raise HTTPException(
@@ -107,33 +171,78 @@ async def upload_statement(
                 detail="This PDF is password-protected. Please provide your M-PESA statement password (usually your national ID)."
             )
         raise HTTPException(status_code=500, detail=f"Failed to process file: {err_msg}")
-    finally:
-        os.unlink(tmp_path)
+
+    job = ingest_jobs.submit(tmp_path, file.filename, password=password or None, pages_total=pages_total,
+                             user_id=user_id)
+    return {
+        **job.to_dict(),
+        "message": f"Processing {file.filename} in the background.",
+    }
+
+
+@app.get("/api/jobs")
+def list_jobs(user_id: str = Depends(get_user_id)):
+    """Recent upload jobs, newest first."""
+    return [job.to_dict() for job in ingest_jobs.recent(user_id)]
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, user_id: str = Depends(get_user_id)):
+    """Stage, progress and final counts of one upload job."""
+    job = ingest_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    return job.to_dict()
+
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    top_limit: int = Query(5, ge=1, le=50),
+    session=Depends(get_db),
+    user_id: str = Depends(get_user_id),
+):
+    """Summary, categories, top expenses and Fuliza analytics in one call."""
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "dashboard", {"top_limit": top_limit}, user_id,
+                         lambda: analytics.dashboard(top_limit=top_limit))
 
 
 @app.get("/api/summary")
-def get_summary():
+async def get_summary(
+    request: Request, response: Response, session=Depends(get_db), user_id: str = Depends(get_user_id),
+):
     """KPI cards: inflow, outflow, net, fuliza used/repaid, merchant spend."""
-    analytics = AnalyticsService()
-    return analytics.summary()
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "summary", {}, user_id, analytics.summary)
 
 
 @app.get("/api/categories")
-def get_categories():
+async def get_categories(
+    request: Request, response: Response, session=Depends(get_db), user_id: str = Depends(get_user_id),
+):
     """Spending grouped by transaction type."""
-    analytics = AnalyticsService()
-    return analytics.spending_by_category()
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "categories", {}, user_id, analytics.spending_by_category)
 
 
 @app.get("/api/top-expenses")
-def get_top_expenses(limit: int = Query(5, ge=1, le=50)):
+async def get_top_expenses(
+    request: Request,
+    response: Response,
+    limit: int = Query(5, ge=1, le=50),
+    session=Depends(get_db),
+    user_id: str = Depends(get_user_id),
+):
     """Largest single expenditures."""
-    analytics = AnalyticsService()
-    return analytics.top_transactions(limit=limit)
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "top-expenses", {"limit": limit}, user_id,
+                         lambda: analytics.top_transactions(limit=limit))
 
 
 @app.get("/api/transactions")
-def get_transactions(
+async def get_transactions(
     start: str | None = Query(None, description="ISO date start"),
     end: str | None = Query(None, description="ISO date end"),
     type: str | None = Query(None, description="Transaction type filter"),
@@ -142,34 +251,156 @@ def get_transactions(
     max: float | None = Query(None, description="Max absolute amount"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page; overrides page"),
+    include_total: bool = Query(True, description="Count matching rows (cached per filter set)"),
+    session=Depends(get_db),
+    user_id: str = Depends(get_user_id),
 ):
-    """Paginated, filterable transaction list."""
-    repo = TransactionRepository()
-    result = repo.get_transactions(
-        start=start,
-        end=end,
-        tx_type=type,
-        q=q,
-        amount_min=min,
-        amount_max=max,
-        page=page,
-        page_size=page_size,
-    )
-    repo.close()
+    """Filterable transaction list, paged by cursor or by page number."""
+    filters = dict(start=start, end=end, tx_type=type, q=q, amount_min=min, amount_max=max)
+    repo = AsyncTransactionRepository(session, user_id)
+    try:
+        result = await repo.get_transactions(
+            **filters, page=page, page_size=page_size, cursor=cursor, include_total=False,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if include_total:
+        # Totals only change with the data, so one COUNT per user, filter set and generation
+        result["total"] = await response_cache.get_or_compute_async(
+            "transactions-total", {**filters, "user_id": user_id}, await _generation(session, user_id),
+            lambda: repo.count_transactions(**filters),
+        )
     return result
 
 
+@app.get("/api/search")
+async def search_transactions(
+    q: str = Query(..., min_length=1, description="Words to look for in descriptions, payees, codes and types"),
+    limit: int = Query(20, ge=1, le=100),
+    session=Depends(get_db),
+    user_id: str = Depends(get_user_id),
+):
+    """Full-text transaction search, best matches first."""
+    results = await AsyncTransactionRepository(session, user_id).search_transactions(q, limit=limit)
+    return {"query": q, "results": results}
+
+
 @app.get("/api/fuliza")
-def get_fuliza():
-    """Full Fuliza analytics with timeline."""
-    analytics = AnalyticsService()
-    return analytics.fuliza_usage()
+async def get_fuliza(
+    request: Request, response: Response, session=Depends(get_db), user_id: str = Depends(get_user_id),
+):
+    """Fuliza totals and ratio; the daily timeline is /api/timeseries?metric=fuliza."""
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "fuliza", {}, user_id, analytics.fuliza_usage)
+
+
+@app.get("/api/timeseries")
+async def get_timeseries(
+    request: Request,
+    response: Response,
+    metric: str = Query("outflow", description="inflow, outflow (amount spent), net or fuliza"),
+    bucket: str = Query("day", description="day, week (from Monday) or month"),
+    type: str | None = Query(None, description="Only this transaction type (category)"),
+    start: str | None = Query(None, description="ISO date start"),
+    end: str | None = Query(None, description="ISO date end"),
+    max_points: int | None = Query(None, ge=3, le=10_000, description="Downsample longer series (LTTB)"),
+    session=Depends(get_db),
+    user_id: str = Depends(get_user_id),
+):
+    """One chart series, bucketed in the database and optionally downsampled to max_points."""
+    params = dict(metric=metric, bucket=bucket, tx_type=type, start=start, end=end, max_points=max_points)
+    try:
+        series_args(metric, bucket, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    analytics = AsyncAnalyticsService(session, user_id)
+    return await _cached(request, response, session, "timeseries", params, user_id,
+                         lambda: analytics.time_series(**params))
+
+
+@app.get("/api/stats/cache")
+def get_cache_stats():
+    """Hit/miss counters and sizes of the server-side caches."""
+    from helpers.statement_cache import statement_cache
+    from tools.tool_cache import tool_cache
+    with SessionLocal() as session:
+        imports = generation.total(session)
+    stats = {
+        "generation": imports,
+        "statements": statement_cache.stats(),
+        "responses": response_cache.stats(),
+        "tools": tool_cache.stats(),
+        "agents": agent_pool.stats(),
+    }
+    if ANALYTICS_BACKEND == "columnar":
+        from services.columnar_analytics import column_store
+        stats["columns"] = column_store.stats()
+    return stats
 
 
 @app.post("/api/chat")
-def chat(req: ChatRequest):
-    """Chat with the AI finance agent."""
-    if _agent is None:
-        raise HTTPException(status_code=503, detail="Agent not ready yet.")
-    response = _agent.invoke({"input": req.message})
-    return ChatResponse(answer=response["output"])
+def chat(req: ChatRequest, user_id: str = Depends(get_user_id)):
+    """Chat with the AI finance agent. Pass back session_id to continue a conversation."""
+    session_id = req.session_id or agent_pool.new_session_id()
+    with agent_pool.checkout(session_id, user_id) as agent:
+        response = agent.invoke({"input": req.message})
+    return ChatResponse(answer=response["output"], session_id=session_id)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest, user_id: str = Depends(get_user_id)):
+    """
+    /api/chat as server-sent events: "session", then "tool" as the agent
+    looks data up and "token" pieces of the answer as they are generated,
+    and finally "done" with the full answer (or "error").
+    """
+    session_id = req.session_id or agent_pool.new_session_id()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def emit(event, data):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    def run_agent():
+        from agents.streaming import ChatStreamHandler
+
+        try:
+            with agent_pool.checkout(session_id, user_id) as agent:
+                response = agent.invoke(
+                    {"input": req.message}, config={"callbacks": [ChatStreamHandler(emit)]}
+                )
+            emit("done", {"answer": response["output"], "session_id": session_id})
+        except Exception as e:
+            emit("error", {"detail": str(e)})
+        finally:
+            emit(None, None)
+
+    async def stream():
+        yield _sse("session", {"session_id": session_id})
+        # The agent is blocking; it runs to completion in the threadpool even
+        # if the client goes away, so the conversation memory stays whole.
+        agent_run = asyncio.ensure_future(run_in_threadpool(run_agent))
+        while True:
+            event, data = await events.get()
+            if event is None:
+                break
+            yield _sse(event, data)
+        await agent_run
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.delete("/api/chat/{session_id}")
+def end_chat(session_id: str, user_id: str = Depends(get_user_id)):
+    """Forget a conversation; the next message with this id starts afresh."""
+    return {"session_id": session_id, "discarded": agent_pool.discard(session_id, user_id)}
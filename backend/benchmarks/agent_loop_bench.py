@@ -0,0 +1,124 @@
+"""
+Agent loop benchmark — per-turn overhead of the finance agent, offline
+======================================================================
+Run:  python -m benchmarks.agent_loop_bench [turns] [memory_tokens]
+
+Drives build_finance_agent through a long conversation (default 60 turns)
+with the scripted fake model from agents/fake_llm.py, so no request
+leaves the machine and the model itself costs nothing. Every turn calls
+two tools and then answers. What remains is the agent's own cost: prompt
+formatting, output parsing, tool dispatch (through the tool cache) and
+memory handling. The run is repeated with the token-window memory
+(memory_tokens, default CHAT_MEMORY_MAX_TOKENS) and with unbounded
+memory, and the table shows how the prompt grows with each.
+
+Uses a temporary SQLite database with synthetic transactions.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/agent_loop.db")
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages.utils import count_tokens_approximately
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+N_ROWS = 20_000
+QUESTIONS = [
+    "How much did I spend compared to what I received?",
+    "Where does most of my money go?",
+    "What were my biggest expenses, and how much Fuliza did I use?",
+]
+ANSWER = (
+    "Here is what your statement shows. You received more than you spent, "
+    "but merchant payments and transfers take most of your outflow. Your "
+    "largest expenses are a handful of big transfers, and Fuliza use is "
+    "modest. Consider setting a monthly cap for merchant spending and "
+    "moving part of every inflow into savings before spending it. "
+) * 2
+
+
+class _TurnStats(BaseCallbackHandler):
+    """Counts LLM and tool calls and records the largest prompt of a turn."""
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.prompt_tokens = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.llm_calls += 1
+        self.prompt_tokens = max(self.prompt_tokens, count_tokens_approximately(messages[0]))
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.tool_calls += 1
+
+
+def _script():
+    from agents.fake_llm import final_answer, tool_call
+
+    # Two tool calls and an answer per turn, visiting all four tools
+    return [
+        tool_call("get_spending_summary"), tool_call("get_spending_by_category"), final_answer(ANSWER),
+        tool_call("get_top_transactions"), tool_call("get_fuliza_usage"), final_answer(ANSWER),
+    ]
+
+
+def _run(label: str, turns: int, memory_tokens: int, checkpoints):
+    from agents.analysing_agent import build_finance_agent
+    from agents.fake_llm import ScriptedChatModel
+
+    agent = build_finance_agent(llm=ScriptedChatModel(script=_script()), memory_max_tokens=memory_tokens)
+    times, per_turn = [], []
+    for turn in range(1, turns + 1):
+        stats = _TurnStats()
+        started = time.perf_counter()
+        result = agent.invoke({"input": QUESTIONS[turn % len(QUESTIONS)]}, config={"callbacks": [stats]})
+        times.append((time.perf_counter() - started) * 1000)
+        assert result["output"] == ANSWER, f"turn {turn} did not follow the script"
+        per_turn.append(stats)
+        if turn in checkpoints:
+            history = len(agent.memory.chat_memory.messages)
+            print(f"{label:<10} {turn:>5} {times[-1]:>9.1f}ms {stats.llm_calls:>6} {stats.tool_calls:>6} "
+                  f"{stats.prompt_tokens:>14,} {history:>9}")
+
+    p95 = statistics.quantiles(times, n=20)[-1]
+    print(f"{label:<10} {'all':>5} {statistics.mean(times):>9.1f}ms mean, {p95:.1f}ms p95, "
+          f"{sum(s.llm_calls for s in per_turn) / turns:.1f} LLM and "
+          f"{sum(s.tool_calls for s in per_turn) / turns:.1f} tool calls per turn\n")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    from agents.analysing_agent import CHAT_MEMORY_MAX_TOKENS
+    memory_tokens = int(sys.argv[2]) if len(sys.argv) > 2 else CHAT_MEMORY_MAX_TOKENS
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import engine
+    from tools.tool_cache import tool_cache
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    repo = TransactionRepository()
+    repo.add_bulk(_synthetic_frame(N_ROWS))
+    repo.close()
+
+    checkpoints = {1, 2, 5, 10, 20, 40, turns} | set(range(100, turns + 1, 100))
+    print(f"{turns} turns, scripted model, {N_ROWS:,} transactions\n")
+    print(f"{'memory':<10} {'turn':>5} {'turn time':>11} {'LLM':>6} {'tools':>6} "
+          f"{'prompt tokens':>14} {'history':>9}")
+    _run("window", turns, memory_tokens, checkpoints)
+    _run("unbounded", turns, 10 ** 9, checkpoints)
+
+    stats = tool_cache.stats()
+    print(f"tool cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
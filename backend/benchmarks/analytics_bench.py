@@ -0,0 +1,150 @@
+"""
+Analytics benchmark — SQL rollups vs in-memory columns
+======================================================
+Run:  python -m benchmarks.analytics_bench [database_url] [sizes]
+
+sizes is a comma-separated list of statement rows (default
+10000,100000,1000000). For each size one user gets a synthetic statement
+from benchmarks/statement_gen.py (every transaction type, Fuliza splits)
+and a second user a smaller one. Every AnalyticsService method (time_series
+for a few metrics and buckets) is then timed on the SQL path and on
+ColumnarAnalyticsService (ANALYTICS_BACKEND=columnar) with warm columns,
+best of five. The columnar path is also
+timed cold (first load of the user's rows) and right after an import of
+another 1,000 rows (the append).
+
+Both paths must give the same results, to the cent; the run exits with
+status 1 otherwise. The transactions table at database_url is DROPPED and
+recreated for every size, so point this at a scratch database. Defaults
+to a temporary SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.statement_gen import expected_frame
+
+USER = "bench"
+NEIGHBOUR = "neighbour"
+APPENDED_ROWS = 1_000
+
+METHODS = {
+    "summary": lambda service: service.summary(),
+    "spending_by_category": lambda service: service.spending_by_category(),
+    "top_transactions": lambda service: service.top_transactions(limit=10),
+    "fuliza_usage": lambda service: service.fuliza_usage(),
+    "dashboard": lambda service: service.dashboard(),
+    "series outflow/day": lambda service: service.time_series("outflow", "day"),
+    "series net/week": lambda service: service.time_series("net", "week"),
+    "series fuliza/month": lambda service: service.time_series("fuliza", "month"),
+    "series merchant/week": lambda service: service.time_series("outflow", "week", tx_type="Merchant Payment"),
+    "series inflow/day 200pt": lambda service: service.time_series("inflow", "day", max_points=200),
+}
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _differences(sql, columnar, path: str = "") -> list[str]:
+    """Where two results differ; numbers may differ by a rounding cent."""
+    if isinstance(sql, dict) and isinstance(columnar, dict):
+        if sql.keys() != columnar.keys():
+            return [f"{path}: keys {sorted(sql)} vs {sorted(columnar)}"]
+        return [d for key in sql for d in _differences(sql[key], columnar[key], f"{path}.{key}")]
+    if isinstance(sql, list) and isinstance(columnar, list):
+        if len(sql) != len(columnar):
+            return [f"{path}: {len(sql)} vs {len(columnar)} items"]
+        return [d for i, (a, b) in enumerate(zip(sql, columnar)) for d in _differences(a, b, f"{path}[{i}]")]
+    if isinstance(sql, float) or isinstance(columnar, float):
+        return [] if abs(sql - columnar) <= 0.011 else [f"{path}: {sql} vs {columnar}"]
+    return [] if sql == columnar else [f"{path}: {sql!r} vs {columnar!r}"]
+
+
+def _comparable(method: str, result):
+    """Categories come back in no particular order from SQL, and tied top amounts in any order."""
+    if method == "spending_by_category":
+        return sorted(result, key=lambda category: category["type"])
+    if method == "top_transactions":
+        return [t["amount"] for t in result]
+    if method == "dashboard":
+        return {**result, "categories": _comparable("spending_by_category", result["categories"]),
+                "top_expenses": _comparable("top_transactions", result["top_expenses"])}
+    return result
+
+
+def _run_size(n: int):
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import SessionLocal, engine
+    from services.analytics import AnalyticsService
+    from services.columnar_analytics import ColumnarAnalyticsService, ColumnStore
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    frame = expected_frame(n + APPENDED_ROWS)
+    # The statement is newest first; import the older rows now and the newest later
+    repo = TransactionRepository(user_id=USER)
+    repo.add_bulk(frame.iloc[APPENDED_ROWS:])
+    repo.close()
+    repo = TransactionRepository(user_id=NEIGHBOUR)
+    repo.add_bulk(expected_frame(n // 10, seed=7))
+    repo.close()
+
+    session = SessionLocal()
+    sql = AnalyticsService(session, user_id=USER)
+    columnar = ColumnarAnalyticsService(session, user_id=USER, store=ColumnStore())
+
+    started = time.perf_counter()
+    columnar.summary()
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    rows, failures = [], []
+    for name, method in METHODS.items():
+        sql_ms = _best_ms(lambda: method(sql))
+        columnar_ms = _best_ms(lambda: method(columnar))
+        rows.append((name, sql_ms, columnar_ms))
+        failures += _differences(_comparable(name, method(sql)), _comparable(name, method(columnar)), name)
+
+    repo = TransactionRepository(session, user_id=USER)
+    repo.add_bulk(frame.iloc[:APPENDED_ROWS])
+    started = time.perf_counter()
+    appended = columnar.dashboard()
+    append_ms = (time.perf_counter() - started) * 1000
+    failures += _differences(_comparable("dashboard", sql.dashboard()),
+                             _comparable("dashboard", appended), "dashboard after import")
+    session.close()
+    return rows, cold_ms, append_ms, failures
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/analytics.db"
+    sizes = [int(s) for s in (sys.argv[2] if len(sys.argv) > 2 else "10000,100000,1000000").split(",")]
+    os.environ["DATABASE_URL"] = url
+
+    print(f"{'rows':>9} {'method':<24} {'sql':>10} {'columnar':>10} {'speedup':>9}")
+    failed = False
+    for n in sizes:
+        rows, cold_ms, append_ms, failures = _run_size(n)
+        for name, sql_ms, columnar_ms in rows:
+            print(f"{n:>9,} {name:<24} {sql_ms:>8.2f}ms {columnar_ms:>8.2f}ms {sql_ms / columnar_ms:>8.1f}x")
+        print(f"{n:>9,} {'columnar cold load':<24} {'':>10} {cold_ms:>8.1f}ms")
+        print(f"{n:>9,} {f'append {APPENDED_ROWS:,} + dashboard':<24} {'':>10} {append_ms:>8.1f}ms\n")
+        for failure in failures:
+            print(f"FAIL {n:,} rows, {failure}")
+        failed = failed or bool(failures)
+
+    if failed:
+        sys.exit(1)
+    print("OK: SQL and columnar results agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Bulk insert benchmark — TransactionRepository.add_bulk throughput
+=================================================================
+Run:  python -m benchmarks.bulk_insert_bench [database_url] [n_rows]
+
+The transactions table at database_url is DROPPED and recreated, so point
+this at a scratch database. Defaults to a temporary SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+_PAYEES = ["NAIVAS", "QUICKMART", "KPLC PREPAID", "JAVA HOUSE", "JANE WANJIKU", "JOHN OTIENO",
+           "SAFARICOM", "CARREFOUR", "ZUKU FIBRE", "NAIROBI WATER"]
+
+
+def _synthetic_frame(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365 * 86400, n), unit="s")
+    frame = pd.DataFrame({
+        "Transaction Code": [f"U{i:09X}" for i in range(n)],
+        "Date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "Type": rng.choice(["Merchant Payment", "Money Transfer", "Received", "Airtime Purchase"], n),
+        "Amount": rng.uniform(-20_000, 20_000, n).round(2),
+        "Balance": rng.uniform(0, 100_000, n).round(2),
+        "Fuliza used": 0.0,
+    })
+    # Payee plus a till number, so searches range from broad to very selective
+    payees = pd.Series(rng.choice(_PAYEES, n)) + " " + pd.Series(rng.integers(1000, 100_000, n)).astype(str)
+    frame["Counterparty"] = payees
+    frame["Description"] = "Merchant Payment Online to " + payees.str.rsplit(" ", n=1).str[-1] + " - " + payees
+    return frame
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    os.environ["DATABASE_URL"] = url
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    df = _synthetic_frame(n)
+
+    repo = TransactionRepository()
+    for label in ("fresh rows", "all duplicates"):
+        started = time.perf_counter()
+        imported, skipped = repo.add_bulk(df)
+        elapsed = time.perf_counter() - started
+        print(f"{engine.dialect.name:<10} {label:<15} {n:>9,} rows  {elapsed:7.2f}s  "
+              f"{n / elapsed:>10,.0f} rows/s  (imported={imported:,} skipped={skipped:,})")
+    repo.close()
+
+
+if __name__ == "__main__":
+    main()
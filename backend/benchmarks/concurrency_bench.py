@@ -0,0 +1,132 @@
+"""
+Concurrency benchmark — dashboard throughput, threadpool vs async engine
+=========================================================================
+Run:  python -m benchmarks.concurrency_bench [database_url] [clients] [seconds]
+
+clients is a comma-separated list of concurrent client counts (default
+50,100,250,500); each level runs for seconds (default 10). The API is
+started twice under uvicorn, with DB_ASYNC=false (blocking sessions in the
+threadpool) and DB_ASYNC=true (aiosqlite / asyncpg), and hammered with
+GET /api/dashboard. The response cache is disabled so every request
+reaches the database. The transactions table at database_url is DROPPED
+and recreated, so point this at a scratch database. Defaults to a
+temporary SQLite file.
+"""
+
+import asyncio
+import collections
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+N_ROWS = 100_000
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _seed(url: str):
+    os.environ["DATABASE_URL"] = url
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    repo = TransactionRepository()
+    repo.add_bulk(_synthetic_frame(N_ROWS))
+    repo.close()
+    engine.dispose()
+
+
+def _start_server(url: str, db_async: bool, port: int):
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        DB_ASYNC="true" if db_async else "false",
+        RESPONSE_CACHE_MAX_ENTRIES="0",
+        PYTHONWARNINGS="ignore",
+    )
+    # A long keep-alive, so a busy client doesn't race uvicorn closing idle connections
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning",
+         "--timeout-keep-alive", "120"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+    import httpx
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/jobs").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+async def _load(base_url: str, clients: int, seconds: float):
+    import httpx
+
+    latencies, errors = [], collections.Counter()
+    stop_at = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/dashboard")
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[f"HTTP {response.status_code}"] += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else float("nan")
+    return len(latencies) / elapsed, pct(0.50), pct(0.99), errors
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/concurrency.db"
+    levels = [int(c) for c in (sys.argv[2] if len(sys.argv) > 2 else "50,100,250,500").split(",")]
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    _seed(url)
+    print(f"{N_ROWS:,} transactions, GET /api/dashboard, response cache off, {seconds:g}s per level\n")
+    print(f"{'mode':<12} {'clients':>8} {'req/s':>9} {'p50':>10} {'p99':>10} {'errors':>7}")
+    for db_async in (False, True):
+        port = _free_port()
+        server = _start_server(url, db_async, port)
+        try:
+            for clients in levels:
+                rps, p50, p99, errors = asyncio.run(_load(f"http://127.0.0.1:{port}", clients, seconds))
+                mode = "async" if db_async else "threadpool"
+                print(f"{mode:<12} {clients:>8} {rps:>9.1f} {p50:>8.1f}ms {p99:>8.1f}ms "
+                      f"{sum(errors.values()):>7}  {', '.join(f'{n} {kind}' for kind, n in errors.items())}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Fuliza consolidation benchmark — vectorized vs the original groupby loop
+========================================================================
+Run:  python -m benchmarks.consolidate_bench [n_rows]
+
+The legacy loop is only timed up to 50k rows; beyond that it takes minutes.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from helpers.file_loader import consolidate_fuliza
+
+_LEGACY_MAX_ROWS = 50_000
+
+
+# ── Reference: the original implementation, kept verbatim for comparison ────
+def _legacy_consolidate_fuliza(df):
+    cleaned = []
+    grouped = df.groupby("Transaction Code", sort=False)
+
+    for code, group in grouped:
+        row = group.iloc[0].copy()
+        row["Fuliza used"] = 0.0
+
+        if "Amount Fulizad" in group["Type"].values:
+            fuliza_amount = group.loc[
+                group["Type"] == "Amount Fulizad", "Amount"
+            ].sum()
+            row["Fuliza used"] = fuliza_amount
+            if row["Type"] == "Amount Fulizad":
+                continue
+
+        cleaned.append(row)
+
+    return pd.DataFrame(cleaned)
+
+
+def _synthetic_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """Roughly one in ten payments is topped up by Fuliza, sharing its code."""
+    rng = np.random.default_rng(seed)
+    n_codes = int(n / 1.1)
+    codes = np.array([f"U{i:09X}" for i in range(n_codes)], dtype=object)
+    amounts = -rng.uniform(10, 5_000, n_codes).round(2)
+    funded = rng.random(n_codes) < 0.1
+
+    # Fuliza rows follow the payment they funded, like on the statement
+    order = np.argsort(np.concatenate([np.arange(n_codes), np.flatnonzero(funded) + 0.5]), kind="stable")
+    code_col = np.concatenate([codes, codes[funded]])[order]
+    type_col = np.concatenate([
+        np.full(n_codes, "Merchant Payment", dtype=object),
+        np.full(funded.sum(), "Amount Fulizad", dtype=object),
+    ])[order]
+    amount_col = np.concatenate([amounts, -amounts[funded] / 2])[order]
+
+    return pd.DataFrame({
+        "Transaction Code": code_col,
+        "Date": "2024-01-01 10:00:00",
+        "Type": type_col,
+        "Amount": amount_col,
+        "Balance": 0.0,
+    })
+
+
+def _timed(fn, df) -> tuple[float, pd.DataFrame]:
+    started = time.perf_counter()
+    result = fn(df)
+    return time.perf_counter() - started, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = _synthetic_frame(n)
+
+    current, result = _timed(consolidate_fuliza, df)
+    print(f"current : {current:8.3f}s  for {len(df):,} rows")
+
+    if len(df) <= _LEGACY_MAX_ROWS:
+        legacy, expected = _timed(_legacy_consolidate_fuliza, df)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        print("✅ Outputs identical")
+        print(f"legacy  : {legacy:8.3f}s")
+        print(f"speedup : {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Index usage check — EXPLAIN every analytics and transaction-list query
+=====================================================================
+Run:  python -m benchmarks.explain_indexes [database_url]
+
+Records the SQL that AnalyticsService and TransactionRepository actually
+emit for one user, EXPLAINs each statement and exits non-zero if any of
+them falls back to a full table scan. The schema is built by `alembic
+upgrade head`, so the indexes checked are the migrations' own rather than
+the models'. The table is filled realistically (the user's 20,000
+transactions among USERS users' in all) and ANALYZEd, and the planner runs
+with its default settings, so the check is that the index is chosen, not
+merely usable. Every table at database_url is DROPPED and recreated, so
+point this at a scratch database. Defaults to temporary SQLite.
+"""
+
+import os
+import sys
+import tempfile
+
+from alembic import command
+from alembic.config import Config
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+from benchmarks.tenant_bench import _add_users, _user
+
+# Users sharing the table; the one checked holds 1/USERS of the rows
+USERS = 50
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def _capture(engine, calls):
+    from sqlalchemy import event
+
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    for call in calls:
+        call()
+    event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+
+def _plan(connection, dialect: str, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+_TABLES = ("transactions", "daily_rollups")
+
+
+def _is_full_scan(dialect: str, plan: str) -> bool:
+    if dialect == "sqlite":
+        # "SCAN transactions" without "USING ... INDEX" reads every row
+        return any(
+            f"SCAN {table}" in line and "INDEX" not in line
+            for line in plan.splitlines() for table in _TABLES
+        )
+    # Index Scan, Index Only Scan or Bitmap Index Scan, and no Seq Scan
+    return "Index" not in plan or any(f"Seq Scan on {table}" in plan for table in _TABLES)
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/explain.db"
+    os.environ["DATABASE_URL"] = url
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import SessionLocal, engine
+    from services.analytics import AnalyticsService
+
+    # The schema comes from the migrations, not the models, so a missing
+    # index in a revision fails here even if the models declare it
+    Base.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    command.upgrade(Config(ALEMBIC_INI), "head")
+    user_id = _user(0)
+    repo = TransactionRepository(user_id=user_id)
+    repo.add_bulk(_synthetic_frame(20_000))
+    with SessionLocal() as session:
+        _add_users(session, 1, USERS)
+        if engine.dialect.name == "postgresql":
+            session.connection().exec_driver_sql("ANALYZE")
+            session.commit()
+    analytics = AnalyticsService(user_id=user_id)
+
+    calls = [
+        analytics.summary,
+        analytics.spending_by_category,
+        lambda: analytics.top_transactions(limit=10),
+        analytics.fuliza_usage,
+        lambda: repo.get_transactions(),
+        lambda: repo.get_transactions(page=50),
+        lambda: repo.get_transactions(tx_type="Merchant Payment"),
+        lambda: repo.get_transactions(start="2023-01-01", end="2023-06-30"),
+        lambda: repo.get_transactions(cursor=repo.get_transactions(page=50)["next_cursor"]),
+        lambda: repo.get_transactions(
+            tx_type="Merchant Payment",
+            cursor=repo.get_transactions(tx_type="Merchant Payment", page=5)["next_cursor"],
+        ),
+        lambda: repo.get_transactions(q="naivas"),
+        lambda: repo.search_transactions("java hou"),
+    ]
+    captured = _capture(engine, calls)
+
+    dialect = engine.dialect.name
+    failures = 0
+    with engine.connect() as connection:
+        for statement, parameters in captured:
+            plan = _plan(connection, dialect, statement, parameters)
+            full_scan = _is_full_scan(dialect, plan)
+            failures += full_scan
+            print(f"{'❌ FULL SCAN' if full_scan else '✅ indexed'}: {' '.join(statement.split())[:110]}")
+            print("    " + plan.replace("\n", "\n    "))
+
+    analytics.close()
+    repo.close()
+    print(f"\n{len(captured) - failures}/{len(captured)} queries use an index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
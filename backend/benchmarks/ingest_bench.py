@@ -0,0 +1,240 @@
+"""
+Ingest benchmark suite — per-stage time and peak memory, against baselines
+==========================================================================
+Run:  python -m benchmarks.ingest_bench [sizes] [--save]
+
+sizes is a comma-separated list of statement rows (default 1000,10000,100000;
+1000000 works but the statements alone take minutes to write). For each
+size a synthetic statement from benchmarks/statement_gen.py is timed
+through every ingest stage:
+
+  load_statements        PDF text extraction
+  load_statements (enc)  the same statement, RC4-encrypted
+  clean_mpesa_text       text → transaction records
+  consolidate_fuliza     folding Fuliza rows into their payments
+  add_bulk               inserting the frame into an empty SQLite table
+  streamed ingest        iter_statement_batches + add_bulk per batch, as
+                         the upload job runs it
+  load_csv               the same statement as CSV, read column-wise
+                         (CSV_ENGINE decides between pyarrow and pandas)
+  streamed ingest (csv)  the CSV through iter_statement_batches + add_bulk
+
+Time is the best of three runs (one above 10,000 rows); peak memory is the
+most Python heap (tracemalloc) a separate run allocated on top of its inputs.
+The consolidated frames from the PDF and the CSV are both checked against
+what the generator put in the statement.
+
+Results are compared with benchmarks/baselines/ingest_bench.json and the
+run exits with status 1 on a wrong result or a regression: a stage slower
+than INGEST_BENCH_TIME_TOLERANCE (default 1.5) times its baseline, or
+using more than INGEST_BENCH_MEMORY_TOLERANCE (default 1.25) times its
+baseline memory. Differences under 50ms or 1MB are ignored as noise.
+
+The streamed stages must also keep memory flat: above 10,000 rows their
+peak may be at most INGEST_BENCH_FLAT_TOLERANCE (default 1.5) times their
+peak at 10,000 rows, taken from this run or else the baseline. With the
+default sizes that checks 100,000 rows against 10,000.
+--save records this run as the new baseline for its sizes. Timings depend
+on the machine, so save baselines on the machine that enforces them.
+
+Generated statements are cached in the temp directory between runs.
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/ingest.db")
+
+import pandas as pd
+
+from benchmarks.statement_gen import cached_statement, expected_frame
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "ingest_bench.json")
+TIME_TOLERANCE = float(os.getenv("INGEST_BENCH_TIME_TOLERANCE", "1.5"))
+MEMORY_TOLERANCE = float(os.getenv("INGEST_BENCH_MEMORY_TOLERANCE", "1.25"))
+FLAT_TOLERANCE = float(os.getenv("INGEST_BENCH_FLAT_TOLERANCE", "1.5"))
+NOISE_SECONDS = 0.05
+NOISE_MB = 1.0
+
+# Stages whose memory must not grow with the statement, and the size they
+# are held to
+FLAT_STAGES = ("streamed ingest", "streamed ingest (csv)")
+FLAT_FROM_ROWS = 10_000
+PASSWORD = "12345678"
+
+
+def _measure(run, setup=None, repeat: int = 3):
+    """Best wall time of run() over repeat runs, and the peak heap MB of one more."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def _empty_table():
+    from database.models import Base
+    from database.session import engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def _add_bulk(df):
+    from database.repository import TransactionRepository
+
+    repo = TransactionRepository()
+    try:
+        repo.add_bulk(df)
+    finally:
+        repo.close()
+
+
+def _streamed_ingest(path):
+    from database.repository import TransactionRepository
+    from helpers.file_loader import iter_statement_batches
+
+    repo = TransactionRepository()
+    try:
+        for batch in iter_statement_batches(path):
+            repo.add_bulk(batch)
+    finally:
+        repo.close()
+
+
+def _run_size(n: int):
+    """Results for one statement size as {stage: {"seconds": ..., "peak_mb": ...}}."""
+    from helpers.file_loader import clean_mpesa_text, consolidate_fuliza, load_csv, load_statements
+
+    pdf = cached_statement(n, ".pdf")
+    csv = cached_statement(n, ".csv")
+    encrypted = cached_statement(n, ".pdf", password=PASSWORD)
+    repeat = 3 if n <= 10_000 else 1
+    results = {}
+    outputs = {}
+
+    def stage(name, run, setup=None):
+        def keep():
+            outputs[name] = run()
+        seconds, peak_mb = _measure(keep, setup, repeat)
+        results[name] = {"seconds": round(seconds, 4), "peak_mb": round(peak_mb, 2)}
+        return outputs.pop(name)
+
+    text = stage("load_statements", lambda: load_statements(pdf))
+    stage("load_statements (enc)", lambda: load_statements(encrypted, PASSWORD))
+    records = stage("clean_mpesa_text", lambda: clean_mpesa_text(text))
+    consolidated = stage("consolidate_fuliza", lambda: consolidate_fuliza(records))
+    stage("add_bulk", lambda: _add_bulk(consolidated), setup=_empty_table)
+    stage("streamed ingest", lambda: _streamed_ingest(pdf), setup=_empty_table)
+    csv_records = stage("load_csv", lambda: load_csv(csv))
+    stage("streamed ingest (csv)", lambda: _streamed_ingest(csv), setup=_empty_table)
+
+    expected = expected_frame(n)
+    pd.testing.assert_frame_equal(consolidated.reset_index(drop=True), expected)
+    pd.testing.assert_frame_equal(consolidate_fuliza(csv_records).reset_index(drop=True), expected)
+    return results
+
+
+def _regressions(n: int, results: dict, baseline: dict):
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if (result["seconds"] > base["seconds"] * TIME_TOLERANCE
+                and result["seconds"] - base["seconds"] > NOISE_SECONDS):
+            found.append(f"{n:,} rows, {name}: {result['seconds']:.3f}s vs {base['seconds']:.3f}s baseline")
+        if (result["peak_mb"] > base["peak_mb"] * MEMORY_TOLERANCE
+                and result["peak_mb"] - base["peak_mb"] > NOISE_MB):
+            found.append(f"{n:,} rows, {name}: {result['peak_mb']:.1f}MB vs {base['peak_mb']:.1f}MB baseline")
+    return found
+
+
+def _growth(measured: dict, baselines: dict):
+    """Streamed stages whose peak memory grew with the statement size."""
+    reference = measured.get(FLAT_FROM_ROWS) or baselines.get(str(FLAT_FROM_ROWS), {})
+    found = []
+    for n, results in measured.items():
+        if n <= FLAT_FROM_ROWS:
+            continue
+        for name in FLAT_STAGES:
+            base, result = reference.get(name), results.get(name)
+            if (base and result and result["peak_mb"] > base["peak_mb"] * FLAT_TOLERANCE
+                    and result["peak_mb"] - base["peak_mb"] > NOISE_MB):
+                found.append(f"{n:,} rows, {name}: {result['peak_mb']:.1f}MB vs {base['peak_mb']:.1f}MB "
+                             f"at {FLAT_FROM_ROWS:,} rows; memory should stay flat")
+    return found
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    save = "--save" in sys.argv[1:]
+    sizes = [int(n) for n in (args[0] if args else "1000,10000,100000").split(",")]
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+
+    from helpers.file_loader import _csv_engine
+
+    print(f"CSV engine: {_csv_engine()}\n")
+    print(f"{'rows':>9} {'stage':<22} {'time':>9} {'rows/s':>11} {'peak MB':>9} {'baseline':>18}")
+    failures = []
+    measured = {}
+    for n in sizes:
+        try:
+            results = _run_size(n)
+        except AssertionError as e:
+            failures.append(f"{n:,} rows: parsed statement differs from what was generated\n{e}")
+            continue
+
+        measured[n] = results
+        baseline = baselines.get(str(n), {})
+        for name, result in results.items():
+            base = baseline.get(name)
+            vs = f"{base['seconds']:.3f}s {base['peak_mb']:.1f}MB" if base else "none"
+            print(f"{n:>9,} {name:<22} {result['seconds']:>8.3f}s {n / result['seconds']:>11,.0f} "
+                  f"{result['peak_mb']:>9.1f} {vs:>18}")
+        print()
+        failures.extend(_regressions(n, results, baseline))
+        if save:
+            baselines[str(n)] = results
+
+    failures.extend(_growth(measured, baselines))
+
+    if save:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: results correct, no regressions, streamed memory flat")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Parser benchmark — clean_mpesa_text vs the original two-pass implementation
+==========================================================================
+Run:  python -m benchmarks.parser_bench [n_transactions]
+
+Builds a synthetic statement, checks that both parsers produce identical
+frames and prints the timings.
+"""
+
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from helpers.file_loader import _to_float, clean_mpesa_text
+
+
+# ── Reference: the original implementation, kept verbatim for comparison ────
+def _legacy_clean_mpesa_text(raw_text: str):
+    transactions = re.split(r'\bU[A-Z0-9]{9,}\b', raw_text)
+    codes = re.findall(r'\bU[A-Z0-9]{9,}\b', raw_text)
+    structured = []
+
+    for code, body in zip(codes, transactions[1:]):
+        date_match = re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', body)
+        date = date_match.group() if date_match else None
+
+        amount_match = re.search(r'(-?\d{1,3}(?:,\d{3})*\.\d{2})', body)
+        amount = _to_float(amount_match.group()) if amount_match else 0.0
+
+        balance_match = re.findall(r'(-?\d{1,3}(?:,\d{3})*\.\d{2})', body)
+        balance = _to_float(balance_match[-1]) if balance_match else 0.0
+
+        body_clean = body.replace("\n", " ").replace("\r", " ")
+
+        if "Funds received" in body_clean:
+            tx_type = "Received"
+        elif "Merchant Payment" in body_clean:
+            tx_type = "Merchant Payment"
+        elif "Loan Repayment" in body_clean or "OD Loan Repayment" in body_clean:
+            tx_type = "Fuliza Repayment"
+        elif "Bundle Purchase" in body_clean:
+            tx_type = "Bundle Purchase"
+        elif "Pay Bill" in body_clean:
+            tx_type = "Merchant Payment"
+        elif "Unit Trust Invest" in body_clean:
+            tx_type = "Ziidi Investment"
+        elif "Customer Transfer" in body_clean:
+            tx_type = "Money Transfer"
+        elif "Airtime Purchase" in body_clean:
+            tx_type = "Airtime Purchase"
+        elif "C2B Transfer" in body_clean:
+            tx_type = "Airtel Money Transfer"
+        elif "Unit Trust Withdraw" in body_clean:
+            tx_type = "Ziidi Withdrawal"
+        elif "OverDraft of Credit Party" in body_clean:
+            tx_type = "Amount Fulizad"
+        elif "Withdrawal Charge" in body_clean:
+            tx_type = "Withdrawal Charge"
+        elif "Customer Withdrawal" in body_clean or "Agent Withdrawal" in body_clean or "Withdraw" in body_clean or "Cash Out" in body_clean:
+            tx_type = "Withdrawal"
+        elif "Business Payment from" in body_clean:
+            tx_type = "Received"
+        elif "Customer Payment to Small" in body_clean:
+            tx_type = "Merchant Payment"
+        else:
+            tx_type = "Other"
+
+        structured.append({
+            "Transaction Code": code,
+            "Date": date,
+            "Type": tx_type,
+            "Amount": amount,
+            "Balance": balance,
+        })
+    return pd.DataFrame(structured)
+
+
+_DETAILS = [
+    ("Funds received from 0712***345 - JANE DOE", 1),
+    ("Merchant Payment Online to 123456 - SUPERMARKET", -1),
+    ("OD Loan Repayment to 232323 - M-PESA Overdraw", -1),
+    ("Bundle Purchase", -1),
+    ("Pay Bill Online to 888880 - KPLC PREPAID Acc. 5512", -1),
+    ("Customer Transfer to 0722***111 - JOHN\nDOE", -1),
+    ("Airtime Purchase", -1),
+    ("Customer Withdrawal At Agent Till 1234 - SHOP", -1),
+    ("Withdrawal Charge", -1),
+    ("Business Payment from 300300 - EMPLOYER LTD", 1),
+]
+
+
+def _synthetic_text(n: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    lines = ["MPESA FULL STATEMENT\nReceipt No. Completion Time Details Status Paid In Withdrawn Balance\n"]
+    balance = 10_000.0
+    for i in range(n):
+        details, sign = rng.choice(_DETAILS)
+        amount = round(rng.uniform(10, 20_000), 2) * sign
+        balance = round(balance + amount, 2)
+        code = "U" + format(i, "09X")
+        lines.append(
+            f"{code} 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+            f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} "
+            f"{details} Completed {amount:,.2f} {balance:,.2f}\n"
+        )
+    return "".join(lines)
+
+
+def _best_of(fn, arg, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    text = _synthetic_text(n)
+
+    # The legacy parser dropped the details text, so compare the columns it had
+    legacy_df = _legacy_clean_mpesa_text(text)
+    pd.testing.assert_frame_equal(clean_mpesa_text(text)[legacy_df.columns], legacy_df)
+    print(f"✅ Outputs identical for {n:,} transactions")
+
+    legacy = _best_of(_legacy_clean_mpesa_text, text)
+    current = _best_of(clean_mpesa_text, text)
+    print(f"legacy  : {legacy:8.3f}s  ({n / legacy:,.0f} tx/s)")
+    print(f"current : {current:8.3f}s  ({n / current:,.0f} tx/s)")
+    print(f"speedup : {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Search benchmark — indexed full-text search vs the old ILIKE scan
+==================================================================
+Run:  python -m benchmarks.search_bench [database_url] [sizes]
+
+sizes is a comma-separated list of table sizes (default 50000,200000,800000).
+Latency of a selective search should stay flat as the table grows, while the
+ILIKE '%q%' scan grows with it. The transactions table at database_url is
+DROPPED and recreated for every size, so point this at a scratch database.
+Defaults to a temporary SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+# (label, query): a single till number, and one payee out of ten
+QUERIES = [("selective", "77925"), ("broad", "naivas")]
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _legacy_ilike(session, q: str, limit: int = 20):
+    from sqlalchemy import or_
+
+    from database.models import Transaction
+
+    pattern = f"%{q}%"
+    return session.query(Transaction).filter(
+        or_(Transaction.transaction_code.ilike(pattern), Transaction.type.ilike(pattern),
+            Transaction.description.ilike(pattern), Transaction.counterparty.ilike(pattern))
+    ).order_by(Transaction.date.desc()).limit(limit).all()
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/search.db"
+    sizes = [int(s) for s in (sys.argv[2] if len(sys.argv) > 2 else "50000,200000,800000").split(",")]
+    os.environ["DATABASE_URL"] = url
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import SessionLocal, engine
+
+    print(f"{'rows':>9}  {'query':<10} {'ilike scan':>11} {'search':>9} {'list q=':>9}")
+    for n in sizes:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        repo = TransactionRepository()
+        repo.add_bulk(_synthetic_frame(n))
+        session = SessionLocal()
+        for label, q in QUERIES:
+            scan = _best_ms(lambda: _legacy_ilike(session, q))
+            ranked = _best_ms(lambda: repo.search_transactions(q))
+            listed = _best_ms(lambda: repo.get_transactions(q=q, include_total=False))
+            print(f"{n:>9,}  {label:<10} {scan:>9.1f}ms {ranked:>7.1f}ms {listed:>7.1f}ms")
+        session.close()
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
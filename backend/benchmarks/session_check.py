@@ -0,0 +1,101 @@
+"""
+Session check — sessions and pooled connections used per API request
+====================================================================
+Run:  python -m benchmarks.session_check [database_url]
+      DB_ASYNC=true python -m benchmarks.session_check [database_url]
+
+Calls every read endpoint in-process over httpx's ASGI transport, all on
+one event loop as under uvicorn, and counts the ORM
+sessions that touched the database and the connections checked out of the
+pool. Each request must use exactly one session and one connection and
+hand the connection back before the response is sent, and a 304
+revalidation must run a single statement (the user's data generation).
+Exits non-zero otherwise. Under ANALYTICS_BACKEND=columnar the analytics
+endpoints also read the generation, so they use one session too.
+
+The transactions table at database_url is DROPPED and recreated, so point
+this at a scratch database. Defaults to a temporary SQLite file.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+ENDPOINTS = [
+    "/api/dashboard",
+    "/api/summary",
+    "/api/categories",
+    "/api/top-expenses?limit=5",
+    "/api/fuliza",
+    "/api/timeseries?bucket=week&max_points=100",
+    "/api/transactions",
+    "/api/transactions?q=naivas&include_total=false",
+    "/api/search?q=java",
+]
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/sessions.db"
+    os.environ["DATABASE_URL"] = url
+
+    import httpx
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    from api import app
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import DB_ASYNC, dispose_async_engine, engine, get_async_engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    repo = TransactionRepository()
+    repo.add_bulk(_synthetic_frame(5_000))
+    repo.close()
+
+    # With DB_ASYNC the endpoints read through the async engine instead
+    read_engine = get_async_engine().sync_engine if DB_ASYNC else engine
+
+    sessions, checkouts, statements = set(), [], []
+    event.listen(Session, "after_begin", lambda session, transaction, connection: sessions.add(id(session)))
+    event.listen(read_engine, "checkout", lambda *args: checkouts.append(1))
+    event.listen(read_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    async def measure(client, path, headers=None):
+        sessions.clear()
+        checkouts.clear()
+        statements.clear()
+        response = await client.get(path, headers=headers or {})
+        return response, len(sessions), len(checkouts), read_engine.pool.checkedout(), len(statements)
+
+    async def check_all():
+        # No lifespan: the agent is not needed to serve analytics
+        transport = httpx.ASGITransport(app=app)
+        failures = 0
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            for path in ENDPOINTS:
+                response, n_sessions, n_conns, left_open, _ = await measure(client, path)
+                ok = response.status_code == 200 and n_sessions == n_conns == 1 and left_open == 0
+                etag = response.headers.get("etag")
+                if etag:
+                    revalidated = await measure(client, path, {"If-None-Match": etag})
+                    ok = ok and revalidated[0].status_code == 304 and revalidated[1:] == (1, 1, 0, 1)
+                failures += not ok
+                print(f"{'✅' if ok else '❌'} {path:<46} {response.status_code:>6} {n_sessions:>9} "
+                      f"{n_conns:>6} {left_open:>10}{'  (+304 in one query)' if etag and ok else ''}")
+        await dispose_async_engine()
+        return failures
+
+    print(f"{'endpoint':<48} {'status':>6} {'sessions':>9} {'conns':>6} {'left open':>10}")
+    failures = asyncio.run(check_all())
+
+    print(f"\n{len(ENDPOINTS) - failures}/{len(ENDPOINTS)} endpoints use one session and one connection"
+          f" ({'async engine' if DB_ASYNC else 'threadpool'})")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
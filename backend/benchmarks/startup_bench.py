@@ -0,0 +1,154 @@
+"""
+Startup benchmark — import time and time to first response, with budgets
+========================================================================
+Run:  python -m benchmarks.startup_bench [runs]
+
+Measures, in fresh interpreters (median of runs, default 5):
+
+  import api        python -c "import api"
+  import main       the CLI, before it asks for a statement
+  first response    uvicorn launched → first 200 from GET /api/dashboard
+  first chat        POST /api/chat on a fresh worker, which imports
+                    LangChain and builds the agent (LLM_BACKEND=fake, so
+                    no request leaves the machine)
+  next chat         the same, once the agent exists
+
+It also checks that importing api loads none of the modules that are meant
+to stay lazy (LangChain, pandas, pypdf).
+
+Exits with status 1 if a check fails or a median goes over its budget, so
+it can gate CI. Budgets are in milliseconds and can be overridden with the
+environment variables below; they are set well above what a laptop
+measures, to catch regressions rather than noise.
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGETS_MS = {
+    "import api": int(os.getenv("STARTUP_BUDGET_IMPORT_API_MS", "1500")),
+    "import main": int(os.getenv("STARTUP_BUDGET_IMPORT_MAIN_MS", "2000")),
+    "first response": int(os.getenv("STARTUP_BUDGET_FIRST_RESPONSE_MS", "3000")),
+    "first chat": int(os.getenv("STARTUP_BUDGET_FIRST_CHAT_MS", "5000")),
+}
+
+# Modules the API must not import until an endpoint needs them
+LAZY_MODULES = ["langchain", "langchain_core", "langchain_groq", "pandas", "pypdf"]
+
+_IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def _env(database_url: str):
+    return dict(os.environ, DATABASE_URL=database_url, LLM_BACKEND="fake", PYTHONWARNINGS="ignore")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _time_import(module: str, database_url: str):
+    """Import time of module in a fresh interpreter, and which lazy modules it loaded."""
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR, env=_env(database_url), capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), out[1].split(",") if len(out) > 1 else []
+
+
+def _time_server(database_url: str):
+    """Milliseconds from launching uvicorn to the first dashboard, first chat and next chat."""
+    import httpx
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(database_url),
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if client.get("/api/dashboard").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start within 60s")
+                time.sleep(0.01)
+            first_response = (time.perf_counter() - started) * 1000
+
+            chats = []
+            session_id = None
+            for _ in range(2):
+                chat_started = time.perf_counter()
+                response = client.post("/api/chat", json={"message": "How am I doing?", "session_id": session_id})
+                response.raise_for_status()
+                session_id = response.json()["session_id"]
+                chats.append((time.perf_counter() - chat_started) * 1000)
+    finally:
+        server.terminate()
+        server.wait()
+    return first_response, chats[0], chats[1]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Empty database: this measures the process, not the data
+    database_url = f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+
+    samples = {name: [] for name in ("import api", "import main", "first response", "first chat", "next chat")}
+    leaked = set()
+    for _ in range(runs):
+        elapsed, loaded = _time_import("api", database_url)
+        samples["import api"].append(elapsed)
+        leaked.update(loaded)
+        samples["import main"].append(_time_import("main", database_url)[0])
+        first_response, first_chat, next_chat = _time_server(database_url)
+        samples["first response"].append(first_response)
+        samples["first chat"].append(first_chat)
+        samples["next chat"].append(next_chat)
+
+    print(f"{runs} runs, medians\n")
+    print(f"{'':<16} {'median':>10} {'min':>10} {'max':>10} {'budget':>10}")
+    failed = []
+    for name, values in samples.items():
+        median = statistics.median(values)
+        budget = BUDGETS_MS.get(name)
+        over = budget is not None and median > budget
+        if over:
+            failed.append(f"{name}: {median:.0f}ms over the {budget}ms budget")
+        print(f"{name:<16} {median:>8.0f}ms {min(values):>8.0f}ms {max(values):>8.0f}ms "
+              f"{f'{budget}ms' if budget else '':>10}{'  OVER' if over else ''}")
+
+    if leaked:
+        failed.append(f"import api loaded {', '.join(sorted(leaked))}; these should be imported lazily")
+
+    print()
+    for failure in failed:
+        print(f"FAIL {failure}")
+    if failed:
+        sys.exit(1)
+    print("OK: all budgets met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Synthetic M-PESA statements — realistic test data without private statements
+============================================================================
+Run:  python -m benchmarks.statement_gen n_rows out.pdf|out.csv [password]
+
+Writes a statement of n_rows transaction rows laid out like the real
+export: a summary block on the first page, a column header and page footer
+on every page, details that wrap onto a second line, and every transaction
+type the parser classifies. About one in twelve payments is part-funded by
+Fuliza, which the statement shows as an "OverDraft of Credit Party" row
+sharing the payment's receipt code, right after it.
+
+A password encrypts the PDF (RC4-128, which pypdf can both write and read
+without optional crypto libraries). The CSV variant has the statement's
+columns, with Paid In and Withdrawn as separate fields.
+
+The same n_rows and seed always give the same statement, and
+expected_frame() returns what load, clean and consolidate_fuliza should
+make of it, so benchmarks can check their output as well as time it.
+Large statements are written a page at a time; memory stays flat.
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Bump when the layout changes, so cached statements are regenerated
+GENERATOR_VERSION = 1
+
+ROWS_PER_PAGE = 40
+CSV_HEADER = ["Receipt No.", "Completion Time", "Details", "Transaction Status", "Paid In", "Withdrawn", "Balance"]
+
+_NAMES = ["JANE WANJIKU", "JOHN OTIENO", "MARY AKINYI", "PETER KAMAU", "GRACE CHEPKOECH",
+          "DAVID MUTUA", "FAITH NJERI", "BRIAN OCHIENG"]
+_MERCHANTS = ["NAIVAS SUPERMARKET", "QUICKMART", "JAVA HOUSE", "CARREFOUR", "CHANDARANA",
+              "TOTALENERGIES", "GOODLIFE PHARMACY", "ARTCAFFE"]
+_BILLERS = [("888880", "KPLC PREPAID"), ("444400", "NAIROBI WATER"), ("320320", "ZUKU FIBRE"),
+            ("247247", "EQUITY BANK"), ("522522", "KCB PAYBILL")]
+_EMPLOYERS = [("300300", "EMPLOYER LTD"), ("505050", "UPWORK KENYA"), ("220220", "BOLT PAYOUTS")]
+
+
+def _phone(rng) -> str:
+    return f"07{rng.randint(0, 99):02d}***{rng.randint(0, 999):03d}"
+
+
+# (details, type the parser should assign, sign, relative frequency). Every
+# rule in helpers.file_loader._TYPE_RULES has at least one entry.
+_KINDS = [
+    (lambda r: f"Funds received from {_phone(r)} - {r.choice(_NAMES)}", "Received", 1, 10),
+    (lambda r: "Business Payment from {} - {} via API".format(*r.choice(_EMPLOYERS)), "Received", 1, 3),
+    (lambda r: f"Merchant Payment Online to {r.randint(100000, 999999)} - {r.choice(_MERCHANTS)}",
+     "Merchant Payment", -1, 20),
+    (lambda r: "Pay Bill Online to {} - {} Acc. {}".format(*r.choice(_BILLERS), r.randint(1000, 99999)),
+     "Merchant Payment", -1, 8),
+    (lambda r: f"Customer Payment to Small Business to {_phone(r)} - {r.choice(_NAMES)}",
+     "Merchant Payment", -1, 6),
+    (lambda r: f"Customer Transfer to {_phone(r)} - {r.choice(_NAMES)}", "Money Transfer", -1, 14),
+    (lambda r: "Airtime Purchase", "Airtime Purchase", -1, 8),
+    (lambda r: "Customer Bundle Purchase with Fuliza", "Bundle Purchase", -1, 4),
+    (lambda r: f"Customer Withdrawal At Agent Till {r.randint(10000, 99999)} - {r.choice(_MERCHANTS)}",
+     "Withdrawal", -1, 6),
+    (lambda r: "Withdrawal Charge", "Withdrawal Charge", -1, 5),
+    (lambda r: "OD Loan Repayment to 232323 - M-PESA Overdraw", "Fuliza Repayment", -1, 4),
+    (lambda r: "Unit Trust Investment to 4107083 - ZIIDI MONEY MARKET FUND", "Ziidi Investment", -1, 2),
+    (lambda r: "Unit Trust Withdrawal from 4107083 - ZIIDI MONEY MARKET FUND", "Ziidi Withdrawal", 1, 1),
+    (lambda r: f"C2B Transfer to Airtel Money {_phone(r)} - {r.choice(_NAMES)}", "Airtel Money Transfer", -1, 2),
+]
+_WEIGHTS = [kind[3] for kind in _KINDS]
+_FULIZA_DETAILS = "OverDraft of Credit Party"
+_FULIZA_SHARE = 1 / 12
+_WRAP_AT = 44
+
+
+def iter_rows(n_rows: int, seed: int = 42):
+    """
+    Yield n_rows statement rows, newest first, as tuples of (code, completed
+    at, details, expected type, amount in cents, balance in cents). Fuliza
+    rows follow the payment they funded and carry its code.
+    """
+    rng = random.Random(seed)
+    when = datetime(2025, 6, 30, 21, 0, 0)
+    balance = 2_500_000
+    emitted = serial = 0
+    while emitted < n_rows:
+        code = f"U{serial:09X}"
+        serial += 1
+        when -= timedelta(seconds=rng.randint(60, 5 * 3600))
+        stamp = when.strftime("%Y-%m-%d %H:%M:%S")
+        make, tx_type, sign, _ = rng.choices(_KINDS, weights=_WEIGHTS)[0]
+        cents = rng.randint(1_000, 2_000_000 if sign > 0 else 800_000)
+        row = (code, stamp, make(rng), tx_type, sign * cents, balance)
+        yield row
+        emitted += 1
+        if sign < 0 and emitted < n_rows and rng.random() < _FULIZA_SHARE:
+            overdraft = rng.randint(1, cents)
+            yield code, stamp, _FULIZA_DETAILS, "Amount Fulizad", overdraft, balance - sign * cents
+            emitted += 1
+        # Rows are listed newest first, so walk the balance backwards
+        balance -= sign * cents
+
+
+def _money(cents: int) -> str:
+    return f"{cents / 100:,.2f}"
+
+
+def expected_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """What the parser plus consolidate_fuliza should produce for this statement."""
+    records = []
+    for code, stamp, details, tx_type, cents, balance in iter_rows(n_rows, seed):
+        if tx_type == "Amount Fulizad":
+            records[-1]["Fuliza used"] += cents / 100
+            continue
+        _, dash, counterparty = details.partition(" - ")
+        records.append({
+            "Transaction Code": code,
+            "Date": stamp,
+            "Type": tx_type,
+            "Amount": cents / 100,
+            "Balance": balance / 100,
+            "Description": details,
+            "Counterparty": counterparty.strip() if dash else None,
+            "Fuliza used": 0.0,
+        })
+    return pd.DataFrame(records)
+
+
+# ── CSV ──────────────────────────────────────────────────────────────────────
+def write_csv(n_rows: int, path: str, seed: int = 42):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for code, stamp, details, _, cents, balance in iter_rows(n_rows, seed):
+            paid_in, withdrawn = (_money(cents), "") if cents > 0 else ("", _money(cents))
+            writer.writerow([code, stamp, details, "Completed", paid_in, withdrawn, _money(balance)])
+
+
+# ── PDF ──────────────────────────────────────────────────────────────────────
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _row_lines(code, stamp, details, cents, balance):
+    # Long details wrap inside their cell; the status and figures sit on
+    # the row's last line
+    head, tail = details, ""
+    if len(details) > _WRAP_AT:
+        cut = details.rfind(" ", 0, _WRAP_AT)
+        head, tail = details[:cut], details[cut + 1:]
+    figures = f"Completed {_money(cents)} {_money(balance)}"
+    if tail:
+        return [f"{code} {stamp} {head}", f"{tail} {figures}"]
+    return [f"{code} {stamp} {head} {figures}"]
+
+
+def _summary_lines(seed: int):
+    rng = random.Random(seed)
+    return [
+        "M-PESA FULL STATEMENT",
+        f"Customer Name: {rng.choice(_NAMES)}",
+        f"Mobile Number: {_phone(rng)}",
+        "Statement Period: 01 Jan 2020 - 30 Jun 2025",
+        "SUMMARY",
+        "TRANSACTION TYPE PAID IN PAID OUT",
+        "SEND MONEY: 0.00 152,300.00",
+        "RECEIVED MONEY: 210,450.00 0.00",
+        "",
+        "DETAILED STATEMENT",
+    ]
+
+
+def _page_lines(n_rows: int, seed: int):
+    """The text lines of each page, a page at a time."""
+    header = "Receipt No. Completion Time Details Transaction Status Paid In Withdrawn Balance"
+    page, number = _summary_lines(seed) + [header], 1
+    for code, stamp, details, _, cents, balance in iter_rows(n_rows, seed):
+        lines = _row_lines(code, stamp, details, cents, balance)
+        if len(page) + len(lines) > ROWS_PER_PAGE + 1:
+            yield page + ["", f"Page {number}"]
+            page, number = [header], number + 1
+        page.extend(lines)
+    yield page + ["", f"Page {number}"]
+
+
+def _content_stream(lines) -> bytes:
+    ops = ["BT /F1 8 Tf 11 TL 36 806 Td"]
+    ops.extend(f"{_pdf_string(line)} Tj T*" for line in lines)
+    ops.append("ET")
+    return zlib.compress("\n".join(ops).encode("latin-1"))
+
+
+def write_pdf(n_rows: int, path: str, seed: int = 42):
+    """Write the statement as an unencrypted PDF, streaming page by page."""
+    # Object 1 is the catalog, 2 the page tree (written last, once every
+    # page is known), 3 the font; pages and their contents follow
+    offsets = {}
+    kids = []
+    with open(path, "wb") as f:
+        def obj(number: int, body: bytes):
+            offsets[number] = f.tell()
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        number = 4
+        for lines in _page_lines(n_rows, seed):
+            data = _content_stream(lines)
+            obj(number, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+            obj(number + 1, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % number)
+            kids.append(number + 1)
+            number += 2
+        obj(2, b"<< /Type /Pages /Count %d /Kids [%s] >>" % (len(kids), b" ".join(b"%d 0 R" % k for k in kids)))
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % number)
+        for n in range(1, number):
+            f.write(b"%010d 00000 n \n" % offsets[n])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (number, xref))
+
+
+def encrypt_pdf(source: str, path: str, password: str):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter(clone_from=source)
+    writer.encrypt(user_password=password, owner_password=None, algorithm="RC4-128")
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def write_statement(n_rows: int, path: str, password: str = None, seed: int = 42):
+    """Write a .pdf or .csv statement to path, encrypted if a password is given (PDF only)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        if password:
+            raise ValueError("Only PDF statements can be encrypted")
+        write_csv(n_rows, path, seed)
+    elif ext == ".pdf":
+        if password:
+            plain = f"{path}.plain"
+            write_pdf(n_rows, plain, seed)
+            try:
+                encrypt_pdf(plain, path, password)
+            finally:
+                os.unlink(plain)
+        else:
+            write_pdf(n_rows, path, seed)
+    else:
+        raise ValueError(f"Unsupported file type {ext}. Use .pdf or .csv")
+
+
+def cached_statement(n_rows: int, ext: str, password: str = None, seed: int = 42) -> str:
+    """
+    Path of a generated statement in the temp directory, writing it on
+    first use. Statements are kept across runs; big ones take a while to
+    write.
+    """
+    directory = os.path.join(tempfile.gettempdir(), "mpesa-synthetic-statements")
+    os.makedirs(directory, exist_ok=True)
+    name = f"statement-{n_rows}-s{seed}-v{GENERATOR_VERSION}{'-encrypted' if password else ''}{ext}"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        partial = f"{path}.{os.getpid()}.partial{ext}"
+        write_statement(n_rows, partial, password, seed)
+        os.replace(partial, path)
+    return path
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python -m benchmarks.statement_gen n_rows out.pdf|out.csv [password]")
+        sys.exit(1)
+    n_rows, path = int(sys.argv[1]), sys.argv[2]
+    password = sys.argv[3] if len(sys.argv) > 3 else None
+    write_statement(n_rows, path, password)
+    print(f"✅ {n_rows:,} rows written to {path} ({os.path.getsize(path) / 1e6:,.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
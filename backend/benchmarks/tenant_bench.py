@@ -0,0 +1,119 @@
+"""
+Tenant benchmark — one user's queries as the number of users grows
+==================================================================
+Run:  python -m benchmarks.tenant_bench [database_url] [user_counts] [rows_per_user]
+
+Fills the database with more and more users (default 10,100,1000,10000,
+each with rows_per_user transactions, default 200) and after each step
+times what one user's dashboard does, for users picked at random: the
+analytics dashboard, the first page of /api/transactions with its total,
+a text-filtered page and a ranked search. With tenant-leading indexes
+these cost the same whether the table holds two thousand rows or two
+million; the table shows the median and the slowest of the sampled users.
+The exception is text search on SQLite: all users share one FTS5 index,
+so a word common to every user costs more as users are added (PostgreSQL
+searches stay flat).
+
+Every sampled user must see exactly their own rows. The transactions
+table at database_url is DROPPED and recreated, so point this at a scratch
+database. Defaults to a temporary SQLite file; on PostgreSQL, set
+DB_TENANT_PARTITIONS to compare with a partitioned table.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+SAMPLED_USERS = 25
+
+QUERIES = {
+    "dashboard": lambda analytics, repo: analytics.dashboard(),
+    "page + total": lambda analytics, repo: repo.get_transactions(),
+    "page q=naivas": lambda analytics, repo: repo.get_transactions(q="naivas", include_total=False),
+    "search": lambda analytics, repo: repo.search_transactions("java hou"),
+}
+
+
+def _user(n: int) -> str:
+    return f"user{n}"
+
+
+def _add_users(session, start: int, stop: int):
+    """Copy user0's transactions to users start..stop-1, with their rollups and search entries."""
+    from sqlalchemy import text
+
+    from database import rollups, search
+
+    last_id = session.execute(text("SELECT COALESCE(MAX(id), 0) FROM transactions")).scalar()
+    columns = "transaction_code, date, type, amount, balance, fuliza_used, description, counterparty"
+    session.execute(text(f"""
+        WITH RECURSIVE n(i) AS (SELECT {start} UNION ALL SELECT i + 1 FROM n WHERE i + 1 < {stop})
+        INSERT INTO transactions (user_id, {columns})
+        SELECT 'user' || n.i, {columns}
+        FROM n CROSS JOIN transactions
+        WHERE transactions.user_id = '{_user(0)}'
+    """))
+    new_rows = f"id > {last_id}"
+    session.execute(text(rollups.rollup_upsert_sql("transactions", new_rows)))
+    if session.get_bind().dialect.name == "sqlite":
+        session.execute(text(search.index_rows_sql(new_rows)))
+    session.commit()
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/tenants.db"
+    counts = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else "10,100,1000,10000").split(",")]
+    rows_per_user = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    os.environ["DATABASE_URL"] = url
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import SessionLocal, engine
+    from services.analytics import AnalyticsService
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    repo = TransactionRepository(user_id=_user(0))
+    repo.add_bulk(_synthetic_frame(rows_per_user))
+    repo.close()
+
+    rng = random.Random(7)
+    print(f"{rows_per_user} transactions per user, {SAMPLED_USERS} users sampled per step\n")
+    print(f"{'':>7} {'':>11}  " + "  ".join(f"{name:>17}" for name in QUERIES))
+    print(f"{'users':>7} {'rows':>11}  " + "  ".join(f"{'median / max ms':>17}" for _ in QUERIES))
+    users = 1
+    failed = False
+    session = SessionLocal()
+    for count in counts:
+        if count > users:
+            _add_users(session, users, count)
+            users = count
+        if engine.dialect.name == "postgresql":
+            session.connection().exec_driver_sql("ANALYZE transactions")
+            session.commit()
+
+        timings = {name: [] for name in QUERIES}
+        for n in rng.sample(range(users), min(SAMPLED_USERS, users)):
+            analytics = AnalyticsService(session, user_id=_user(n))
+            repo = TransactionRepository(session, user_id=_user(n))
+            for name, query in QUERIES.items():
+                started = time.perf_counter()
+                result = query(analytics, repo)
+                timings[name].append((time.perf_counter() - started) * 1000)
+                if name == "page + total" and result["total"] != rows_per_user:
+                    print(f"FAIL {_user(n)} sees {result['total']} transactions, not {rows_per_user}")
+                    failed = True
+
+        cells = "  ".join(f"{statistics.median(ms):>8.1f} / {max(ms):>6.1f}" for ms in timings.values())
+        print(f"{users:>7,} {users * rows_per_user:>11,}  {cells}")
+    session.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Tenant search check — users whose ids share words
+=================================================
+Run:  python -m benchmarks.tenant_search_check [database_url]
+
+Search must return only the acting user's rows, even when another user's
+id contains theirs as a word ("alice" inside "alice.smith", "bob.alice",
+"alice@work" or "alice-2"), and when those users have many more matching
+rows than fit in one page of results. For every user the check runs a
+ranked search and a text-filtered transaction list and exits non-zero if
+either returns another user's row or misses one of the user's own.
+
+The transactions table at database_url is DROPPED and recreated, so point
+this at a scratch database. Defaults to a temporary SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.bulk_insert_bench import _synthetic_frame
+
+# user id -> how many NAIVAS transactions they have; "alice" has the fewest
+USERS = {"alice": 5, "alice.smith": 50, "bob.alice": 50, "alice@work": 50, "alice-2": 50}
+LIMIT = 5
+
+
+def _prefix(user_id: str) -> str:
+    return f"U{list(USERS).index(user_id)}X"
+
+
+def _frame(user_id: str, n: int):
+    frame = _synthetic_frame(n).assign(Counterparty="NAIVAS SUPERMARKET",
+                                       Description="Merchant Payment to NAIVAS SUPERMARKET")
+    # One-word codes led by the user's number, so a stray row is recognisable
+    # and every user's rows rank the same (later imports win ties)
+    frame["Transaction Code"] = [f"{_prefix(user_id)}{i:06d}" for i in range(n)]
+    return frame
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{tempfile.mkdtemp()}/tenant_search.db"
+    os.environ["DATABASE_URL"] = url
+
+    from database.models import Base
+    from database.repository import TransactionRepository
+    from database.session import engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for user_id, n in USERS.items():
+        repo = TransactionRepository(user_id=user_id)
+        repo.add_bulk(_frame(user_id, n))
+        repo.close()
+
+    failures = 0
+    print(f"{'user':<14} {'search':>8} {'list q=':>8} {'total':>6}")
+    for user_id, n in USERS.items():
+        repo = TransactionRepository(user_id=user_id)
+        found = repo.search_transactions("naivas", limit=LIMIT)
+        listed = repo.get_transactions(q="naivas", page_size=LIMIT)
+        codes = [r["transaction_code"] for r in found + listed["data"]]
+        ok = (
+            len(found) == len(listed["data"]) == min(n, LIMIT)
+            and listed["total"] == n
+            and all(code.startswith(_prefix(user_id)) for code in codes)
+        )
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {user_id:<12} {len(found):>8} {len(listed['data']):>8} {listed['total']:>6}")
+        repo.close()
+
+    print(f"\n{len(USERS) - failures}/{len(USERS)} users see exactly their own matches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
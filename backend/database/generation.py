@@ -0,0 +1,55 @@
+"""
+Data generation counters
+========================
+One number per user that goes up every time an import commits new
+transactions for that user. Anything derived from the database (cached
+analytics responses, tool results, ETags, in-memory columns) is tagged
+with its user's generation at the time it was computed and is stale once
+that counter moves on. An import for one user leaves every other user's
+caches warm.
+
+The counters are stored in the data_generations table and bumped inside
+the import's own transaction, so every worker process sees every import
+as soon as it commits. Reading one is a primary-key lookup, which is all
+a cache hit or a 304 costs. `python -m database.rollups`, the rebuild to
+run after editing transactions by hand, bumps every user.
+"""
+
+from sqlalchemy import text
+
+from database.tenancy import DEFAULT_USER_ID
+
+_CURRENT = text("SELECT generation FROM data_generations WHERE user_id = :user_id")
+
+_BUMP = text("""
+    INSERT INTO data_generations (user_id, generation) VALUES (:user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET generation = data_generations.generation + 1
+""")
+
+_BUMP_ALL = text("""
+    INSERT INTO data_generations (user_id, generation)
+    SELECT DISTINCT user_id, 1 FROM transactions WHERE true
+    ON CONFLICT (user_id) DO UPDATE SET generation = data_generations.generation + 1
+""")
+
+_TOTAL = text("SELECT COALESCE(SUM(generation), 0) FROM data_generations")
+
+
+def current(session, user_id: str = DEFAULT_USER_ID) -> int:
+    """user_id's generation as committed; 0 before their first import."""
+    return session.execute(_CURRENT, {"user_id": user_id}).scalar() or 0
+
+
+def bump(session, user_id: str = DEFAULT_USER_ID):
+    """Advance user_id's generation in the session's transaction; commit it with the new rows."""
+    session.execute(_BUMP, {"user_id": user_id})
+
+
+def bump_all(session):
+    """Advance the generation of every user with transactions, in the session's transaction."""
+    session.execute(_BUMP_ALL)
+
+
+def total(session) -> int:
+    """Imports committed so far, over all users."""
+    return session.execute(_TOTAL).scalar()
@@ -1,18 +1,129 @@
 from email.policy import default
 from enum import unique
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import (
+    Column, Integer, String, Float, Date, DateTime, Index, UniqueConstraint, DDL, event, func, literal_column,
+)
+
+from database.session import is_sqlite
+from database.tenancy import DB_TENANT_PARTITIONS, DEFAULT_USER_ID
 
 Base = declarative_base()
 
+
+def _search_vector(description, counterparty, transaction_code, type_):
+    """
+    to_tsvector over everything /api/search matches. PostgreSQL only uses
+    the GIN index when a query repeats this expression exactly.
+    """
+    space = literal_column("' '")
+    document = (
+        func.coalesce(description, literal_column("''")).op("||")(space)
+        .op("||")(func.coalesce(counterparty, literal_column("''"))).op("||")(space)
+        .op("||")(transaction_code).op("||")(space)
+        .op("||")(type_)
+    )
+    return func.to_tsvector(literal_column("'simple'::regconfig"), document)
+
+
+# Hash-partition transactions by user on PostgreSQL (see database/tenancy.py).
+# A partitioned table's primary key must contain the partition key, hence
+# (id, user_id); ids still come from one sequence and stay unique.
+_partitioned = DB_TENANT_PARTITIONS > 0 and not is_sqlite
+
+
 class Transaction(Base):
     __tablename__="transactions"
 
-    id = Column(Integer, primary_key=True)
-    transaction_code = Column(String, unique=True, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False, default=DEFAULT_USER_ID, server_default=DEFAULT_USER_ID,
+                     primary_key=_partitioned)
+    transaction_code = Column(String, nullable=False)
     date=Column(DateTime,nullable=False)
     type = Column(String, nullable=False)
     amount = Column(Float, nullable=False)
     balance = Column(Float, nullable=False)
     fuliza_used = Column(Float, default=0.0)
-    
+    description = Column(String, nullable=True)
+    counterparty = Column(String, nullable=True)
+
+    # Tuned to the filters in AnalyticsService and TransactionRepository:
+    # amount sign (inflow/outflow/top expenses), type, fuliza_used > 0 and
+    # the (date, id) keyset ordering of /api/transactions, overall and per type.
+    # Every query is for one user, so user_id leads each index and a query
+    # only ever reads that user's slice of it, however many users there are.
+    __table_args__ = (
+        UniqueConstraint("user_id", "transaction_code", name="uq_transactions_user_code"),
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        Index("ix_transactions_user_amount_type", "user_id", "amount", "type"),
+        Index("ix_transactions_user_type_amount", "user_id", "type", "amount"),
+        Index("ix_transactions_user_fuliza_used_date", "user_id", "fuliza_used", "date"),
+        Index("ix_transactions_user_type_date_id", "user_id", "type", "date", "id"),
+        Index(
+            "ix_transactions_search",
+            _search_vector(description, counterparty, transaction_code, type),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "HASH (user_id)"} if _partitioned else {},
+    )
+
+
+transaction_search_vector = _search_vector(
+    Transaction.description, Transaction.counterparty, Transaction.transaction_code, Transaction.type
+)
+
+
+# ── Full-text search (see database/search.py) ──────────────────────────────
+# PostgreSQL keeps ix_transactions_search up to date by itself. SQLite gets an
+# FTS5 index over the same columns instead; it is external-content (reads text
+# from transactions by rowid), and add_bulk adds the new rows to it. Its
+# user_id column holds search.user_token(user_id), one token per user, so a
+# search can ask FTS5 for exactly one user's matches.
+TRANSACTIONS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, counterparty, transaction_code, type, user_id, "
+    "content='transactions', content_rowid='id', prefix='2 3')"
+)
+event.listen(Transaction.__table__, "after_create",
+             DDL(TRANSACTIONS_FTS_DDL).execute_if(dialect="sqlite"))
+event.listen(Transaction.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS transactions_fts").execute_if(dialect="sqlite"))
+
+
+# ── Tenant partitions (PostgreSQL, DB_TENANT_PARTITIONS > 0) ───────────────
+# Indexes created on the parent are created on every partition, and a user's
+# queries only touch the partition their user_id hashes to.
+def _create_partitions(target, connection, **kw):
+    for remainder in range(DB_TENANT_PARTITIONS):
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS transactions_p{remainder} PARTITION OF transactions "
+            f"FOR VALUES WITH (MODULUS {DB_TENANT_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+if _partitioned:
+    event.listen(Transaction.__table__, "after_create", _create_partitions)
+
+
+class DailyRollup(Base):
+    """Per-user, per-day, per-type totals, kept in step with transactions by add_bulk."""
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(String, primary_key=True)
+    tx_count = Column(Integer, nullable=False, default=0)
+    inflow_total = Column(Float, nullable=False, default=0.0)
+    inflow_count = Column(Integer, nullable=False, default=0)
+    outflow_total = Column(Float, nullable=False, default=0.0)
+    outflow_count = Column(Integer, nullable=False, default=0)
+    fuliza_used_total = Column(Float, nullable=False, default=0.0)
+    fuliza_used_count = Column(Integer, nullable=False, default=0)
+
+
+class DataGeneration(Base):
+    """Per-user counter bumped by every import that adds rows (see database/generation.py)."""
+    __tablename__ = "data_generations"
+
+    user_id = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
@@ -1,62 +1,215 @@
+import base64
+import io
+import json
+import os
 from datetime import datetime
-from sqlalchemy import func, or_
-from database.session import SessionLocal
+from itertools import islice
+from sqlalchemy import column, func, table, tuple_
+from sqlalchemy.orm import aliased
+from database import generation, rollups, search
+from database.session import SessionLocal, run_with_session
 from database.models import Transaction
+from database.tenancy import DEFAULT_USER_ID
+
+# Rows per INSERT round trip in add_bulk
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "5000"))
+
+_COLUMN_NAMES = {
+    "Transaction Code": "transaction_code",
+    "Date": "date",
+    "Type": "type",
+    "Amount": "amount",
+    "Balance": "balance",
+    "Fuliza used": "fuliza_used",
+    "Description": "description",
+    "Counterparty": "counterparty",
+}
+
+
+def _coerce_money(series):
+    """Vectorized float conversion that also accepts strings like '-1,460.00'."""
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float).fillna(0.0)
+    text = series.astype(str).str.replace(",", "", regex=False)
+    return pd.to_numeric(text, errors="coerce").fillna(0.0)
+
+
+def encode_cursor(t) -> str:
+    """Opaque keyset cursor pointing just past transaction t in (date, id) order."""
+    raw = json.dumps([t.date.isoformat(), t.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor. Raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date, tx_id = json.loads(raw)
+        return datetime.fromisoformat(date), int(tx_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+# Every column add_bulk writes — the staging table mirrors these
+_STAGE_COLUMNS = [c for c in Transaction.__table__.columns.keys() if c != "id"]
 
 
 class TransactionRepository:
+    """
+    Reads and writes one user's transactions through a single session.
+    Pass the request's session in the API; without one the repository
+    opens its own, and close() releases it.
+    """
+
+    def __init__(self, session=None, user_id: str = DEFAULT_USER_ID):
+        self._owns_session = session is None
+        self.session = SessionLocal() if session is None else session
+        self.user_id = user_id
 
-    def __init__(self):
-        self.session = SessionLocal()
+    def add_bulk(self, df, chunk_size: int = BULK_INSERT_CHUNK_SIZE):
+        """
+        Insert a frame of parsed transactions for this user, skipping codes
+        the user already has. Returns (imported, skipped) as counted by the
+        insert itself.
 
-    def add_bulk(self, df):
+        The frame is loaded into a temporary staging table (COPY on
+        PostgreSQL with psycopg2, chunked executemany otherwise) and moved
+        over with one INSERT ... SELECT ... ON CONFLICT DO NOTHING. The daily
+        rollups (and on SQLite the search index) are updated from exactly the
+        rows that insert added, and the user's data generation is bumped, all
+        in the same transaction.
+
+        Only SQLite and PostgreSQL are supported; any other DATABASE_URL
+        raises RuntimeError before anything is written.
+        """
         import pandas as pd
 
-        df = df.rename(columns={
-            "Transaction Code": "transaction_code",
-            "Date": "date",
-            "Type": "type",
-            "Amount": "amount",
-            "Balance": "balance",
-            "Fuliza used": "fuliza_used",
-        })
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            raise RuntimeError(
+                f"Transactions can only be imported into SQLite or PostgreSQL, not {dialect}. "
+                f"Point DATABASE_URL at a sqlite:/// or postgresql:// database."
+            )
+
+        df = df.rename(columns=_COLUMN_NAMES)
+        if df.empty:
+            return 0, 0
+        df = df.reindex(columns=_STAGE_COLUMNS)
+        df["user_id"] = self.user_id
 
         # Convert date strings to datetime objects
         df["date"] = pd.to_datetime(df["date"], errors="coerce")
 
         # Ensure numeric columns are floats (not comma-formatted strings)
         for col in ["amount", "balance", "fuliza_used"]:
-            if col in df.columns:
-                df[col] = df[col].apply(
-                    lambda x: float(str(x).replace(",", "")) if x else 0.0
-                )
+            df[col] = _coerce_money(df[col])
 
-        records = df.to_dict(orient="records")
+        # Missing details text is stored as NULL, never as NaN
+        for col in ["description", "counterparty"]:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
 
-        # Use INSERT OR IGNORE to skip duplicates on re-run
-        self.session.execute(
-            Transaction.__table__.insert().prefix_with("OR IGNORE"),
-            records
+        connection = self.session.connection()
+        columns = ", ".join(_STAGE_COLUMNS)
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE IF NOT EXISTS transactions_stage AS "
+            f"SELECT {columns} FROM transactions WHERE 1 = 0"
         )
+        self._stage(df, chunk_size, dialect)
+
+        if dialect == "sqlite":
+            imported = self._merge_stage_sqlite(columns)
+        else:
+            imported = self._merge_stage_postgres(columns)
+        connection.exec_driver_sql("DELETE FROM transactions_stage")
+        if imported:
+            generation.bump(self.session, self.user_id)
         self.session.commit()
 
+        return imported, len(df) - imported
+
+    def _stage(self, df, chunk_size: int, dialect: str):
+        connection = self.session.connection()
+        columns = ", ".join(df.columns)
+
+        if dialect == "sqlite":
+            # SQLAlchemy stores SQLite datetimes as ISO strings; rendering them
+            # up front lets us skip its per-row type processing entirely.
+            df = df.assign(date=df["date"].dt.strftime("%Y-%m-%d %H:%M:%S.%f"))
+            placeholders = ", ".join(["?"] * len(df.columns))
+            sql = f"INSERT INTO transactions_stage ({columns}) VALUES ({placeholders})"
+            rows = df.itertuples(index=False, name=None)
+            while chunk := list(islice(rows, chunk_size)):
+                connection.exec_driver_sql(sql, chunk)
+            return
+
+        cursor = connection.connection.dbapi_connection.cursor()
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buffer = io.StringIO()
+            df.to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY transactions_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.close()
+            return
+
+        stage = table("transactions_stage", *[column(c) for c in df.columns])
+        for start in range(0, len(df), chunk_size):
+            records = df.iloc[start:start + chunk_size].to_dict(orient="records")
+            connection.execute(stage.insert(), records)
+
+    def _merge_stage_sqlite(self, columns: str) -> int:
+        connection = self.session.connection()
+        imported = connection.exec_driver_sql(
+            f"INSERT INTO transactions ({columns}) "
+            f"SELECT {columns} FROM transactions_stage WHERE true "
+            f"ON CONFLICT (user_id, transaction_code) DO NOTHING"
+        ).rowcount
+        if imported > 0:
+            # SQLite hands out rowids as max(rowid) + 1, and nobody else can
+            # write during our statement, so the new rows are one id range.
+            last_id = connection.exec_driver_sql("SELECT last_insert_rowid()").scalar()
+            new_rows = f"id BETWEEN {last_id - imported + 1} AND {last_id}"
+            connection.exec_driver_sql(rollups.rollup_upsert_sql("transactions", new_rows))
+            connection.exec_driver_sql(search.index_rows_sql(new_rows))
+        return max(imported, 0)
+
+    def _merge_stage_postgres(self, columns: str) -> int:
+        return self.session.connection().exec_driver_sql(f"""
+            WITH inserted AS (
+                INSERT INTO transactions ({columns})
+                SELECT {columns} FROM transactions_stage
+                ON CONFLICT (user_id, transaction_code) DO NOTHING
+                RETURNING user_id, date, type, amount, fuliza_used
+            ), rolled_up AS (
+                {rollups.rollup_upsert_sql("inserted")}
+                RETURNING 1
+            )
+            SELECT COUNT(*) FROM inserted
+        """).scalar()
+
     def get_all(self):
-        return self.session.query(Transaction).all()
+        return self.session.query(Transaction).filter(Transaction.user_id == self.user_id).all()
 
-    def get_transactions(
-        self,
+    @staticmethod
+    def _filtered(
+        session,
+        user_id: str,
         start: str | None = None,
         end: str | None = None,
         tx_type: str | None = None,
         q: str | None = None,
         amount_min: float | None = None,
         amount_max: float | None = None,
-        page: int = 1,
-        page_size: int = 20,
     ):
-        """Return paginated, filtered transactions."""
-        session = SessionLocal()
-        query = session.query(Transaction)
+        # match_clause keeps to the user's rows itself, in the way each
+        # database plans best
+        if q:
+            query = session.query(Transaction).filter(
+                search.match_clause(session.get_bind().dialect.name, q, user_id)
+            )
+        else:
+            query = session.query(Transaction).filter(Transaction.user_id == user_id)
 
         if start:
             query = query.filter(Transaction.date >= datetime.fromisoformat(start))
@@ -64,32 +217,72 @@ class TransactionRepository:
             query = query.filter(Transaction.date <= datetime.fromisoformat(end))
         if tx_type:
             query = query.filter(Transaction.type == tx_type)
-        if q:
-            pattern = f"%{q}%"
-            query = query.filter(
-                or_(
-                    Transaction.transaction_code.ilike(pattern),
-                    Transaction.type.ilike(pattern),
-                )
-            )
         if amount_min is not None:
             query = query.filter(func.abs(Transaction.amount) >= amount_min)
         if amount_max is not None:
             query = query.filter(func.abs(Transaction.amount) <= amount_max)
+        return query
 
-        total = query.count()
-        rows = (
-            query.order_by(Transaction.date.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
-        session.close()
+    def count_transactions(self, **filters) -> int:
+        """Number of transactions matching the get_transactions filters."""
+        return self._filtered(self.session, self.user_id, **filters).count()
+
+    def get_transactions(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        tx_type: str | None = None,
+        q: str | None = None,
+        amount_min: float | None = None,
+        amount_max: float | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
+        include_total: bool = True,
+    ):
+        """
+        Return filtered transactions, newest first, ordered by (date, id).
+
+        With a cursor (the next_cursor of a previous page) the page is read
+        with a keyset seek, so deep pages cost the same as the first one;
+        otherwise page/page_size use OFFSET as before. next_cursor is None
+        on the last page. Set include_total=False to skip the COUNT query.
+        """
+        filters = dict(start=start, end=end, tx_type=tx_type, q=q,
+                       amount_min=amount_min, amount_max=amount_max)
+        session = self.session
+        query = self._filtered(session, self.user_id, **filters)
+
+        total = query.count() if include_total else None
+
+        # With a text query on PostgreSQL, collect the matches first and order
+        # only those. It can't estimate prefix matches, and walking the date
+        # index instead re-checks the search on every row until the page
+        # fills up. SQLite already starts from the FTS match list.
+        entity = Transaction
+        if q and session.get_bind().dialect.name == "postgresql":
+            entity = aliased(Transaction, query.offset(0).subquery())
+            query = session.query(entity)
+
+        ordered = query.order_by(entity.date.desc(), entity.id.desc())
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            ordered = ordered.filter(
+                tuple_(entity.date, entity.id) < tuple_(after_date, after_id)
+            )
+        else:
+            ordered = ordered.offset((page - 1) * page_size)
+        # One extra row tells us whether another page follows
+        rows = ordered.limit(page_size + 1).all()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
 
         return {
             "total": total,
-            "page": page,
+            "page": None if cursor else page,
             "page_size": page_size,
+            "next_cursor": encode_cursor(rows[-1]) if has_more else None,
             "data": [
                 {
                     "transaction_code": t.transaction_code,
@@ -98,20 +291,72 @@ class TransactionRepository:
                     "amount": t.amount,
                     "balance": t.balance,
                     "fuliza_used": t.fuliza_used,
+                    "description": t.description,
+                    "counterparty": t.counterparty,
                 }
                 for t in rows
             ],
         }
 
+    def search_transactions(self, q: str, limit: int = 20):
+        """Transactions matching q by description, counterparty, code or type, best first."""
+        results = search.ranked(self.session, q, limit, self.user_id)
+        return [
+            {
+                "transaction_code": t.transaction_code,
+                "date": str(t.date),
+                "type": t.type,
+                "amount": t.amount,
+                "balance": t.balance,
+                "fuliza_used": t.fuliza_used,
+                "description": t.description,
+                "counterparty": t.counterparty,
+                "score": round(score, 6),
+            }
+            for t, score in results
+        ]
+
     def total_spent(self):
         return self.session.query(
             func.sum(Transaction.amount)
-        ).filter(Transaction.amount < 0).scalar()
+        ).filter(Transaction.user_id == self.user_id, Transaction.amount < 0).scalar()
 
     def total_received(self):
         return self.session.query(
             func.sum(Transaction.amount)
-        ).filter(Transaction.amount > 0).scalar()
+        ).filter(Transaction.user_id == self.user_id, Transaction.amount > 0).scalar()
 
     def close(self):
-        self.session.close()
\ No newline at end of file
+        if self._owns_session:
+            self.session.close()
+
+
+class AsyncTransactionRepository:
+    """
+    Awaitable TransactionRepository for async endpoints. session is an
+    AsyncSession (queries await the async driver) or a plain Session (they
+    run in the threadpool); the query code itself is TransactionRepository's.
+    The caller owns the session.
+    """
+
+    def __init__(self, session, user_id: str = DEFAULT_USER_ID):
+        self.session = session
+        self.user_id = user_id
+
+    def _repo(self, session) -> TransactionRepository:
+        return TransactionRepository(session, user_id=self.user_id)
+
+    async def count_transactions(self, **filters) -> int:
+        return await run_with_session(
+            self.session, lambda s: self._repo(s).count_transactions(**filters)
+        )
+
+    async def get_transactions(self, **kwargs):
+        return await run_with_session(
+            self.session, lambda s: self._repo(s).get_transactions(**kwargs)
+        )
+
+    async def search_transactions(self, q: str, limit: int = 20):
+        return await run_with_session(
+            self.session, lambda s: self._repo(s).search_transactions(q, limit=limit)
+        )
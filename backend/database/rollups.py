@@ -0,0 +1,73 @@
+"""
+Daily rollups
+=============
+Per-user, per-day, per-type totals of the transactions table, so
+analytics cost depends on the number of days rather than the number of
+transactions.
+
+add_bulk folds every batch of newly inserted rows in incrementally; run
+`python -m database.rollups` to rebuild the table from scratch.
+"""
+
+from sqlalchemy import text
+
+from database import generation
+from database.session import SessionLocal
+
+_TOTALS = ("tx_count", "inflow_total", "inflow_count", "outflow_total",
+           "outflow_count", "fuliza_used_total", "fuliza_used_count")
+
+
+def rollup_upsert_sql(source: str, where: str = "true") -> str:
+    """
+    INSERT that aggregates rows of `source` (anything with user_id, date,
+    type, amount and fuliza_used columns) and adds them onto the existing
+    rollups.
+    Works on SQLite and PostgreSQL.
+    """
+    updates = ",\n            ".join(
+        f"{col} = daily_rollups.{col} + excluded.{col}" for col in _TOTALS
+    )
+    return f"""
+        INSERT INTO daily_rollups (user_id, day, type, {", ".join(_TOTALS)})
+        SELECT user_id, date(date), type,
+               COUNT(*),
+               COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),
+               COUNT(CASE WHEN amount > 0 THEN 1 END),
+               COALESCE(SUM(CASE WHEN amount < 0 THEN amount END), 0),
+               COUNT(CASE WHEN amount < 0 THEN 1 END),
+               COALESCE(SUM(CASE WHEN fuliza_used > 0 THEN fuliza_used END), 0),
+               COUNT(CASE WHEN fuliza_used > 0 THEN 1 END)
+        FROM {source}
+        WHERE {where}
+        GROUP BY user_id, date(date), type
+        ON CONFLICT (user_id, day, type) DO UPDATE SET
+            {updates}
+    """
+
+
+def rebuild(session) -> int:
+    """
+    Recompute every rollup from the transactions table. Returns the row
+    count. Every user's generation moves on too, so no cache outlives a
+    hand edit.
+    """
+    session.execute(text("DELETE FROM daily_rollups"))
+    session.execute(text(rollup_upsert_sql("transactions")))
+    generation.bump_all(session)
+    session.commit()
+    return session.execute(text("SELECT COUNT(*) FROM daily_rollups")).scalar()
+
+
+def ensure_built(session):
+    """Backfill the rollups once for databases that predate them."""
+    has_rollups = session.execute(text("SELECT 1 FROM daily_rollups LIMIT 1")).first()
+    has_transactions = session.execute(text("SELECT 1 FROM transactions LIMIT 1")).first()
+    if has_transactions and not has_rollups:
+        rebuild(session)
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    print(f"Rebuilt {rebuild(session)} daily rollups.")
+    session.close()
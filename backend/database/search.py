@@ -0,0 +1,143 @@
+"""
+Transaction search
+==================
+Word-prefix search over description, counterparty, transaction code and
+type: every word of the query must start a word of the transaction. A
+search only ever returns the given user's transactions.
+
+SQLite uses the FTS5 table transactions_fts (ranked with bm25), which
+add_bulk fills as rows arrive. Its user_id column holds user_token(user_id),
+one opaque token per user, so the match is narrowed to exactly one user
+inside the index, before any ranking or LIMIT. PostgreSQL uses the GIN index ix_transactions_search
+(ranked with ts_rank), which it maintains itself.
+Run `python -m database.search` to rebuild the SQLite index from scratch.
+"""
+
+import re
+
+from sqlalchemy import and_, column, false, func, literal_column, select, table, text
+
+from database.models import Transaction, transaction_search_vector
+from database.session import SessionLocal
+from database.tenancy import DEFAULT_USER_ID
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# bm25 weights for description, counterparty, transaction_code, type, user_id
+_FTS_WEIGHTS = (2.0, 4.0, 1.0, 0.5, 0.0)
+_FTS_TEXT_COLUMNS = "{description counterparty transaction_code type}"
+
+_fts = table("transactions_fts", column("rowid"))
+
+
+def _words(q: str):
+    return _WORD_RE.findall(q)
+
+
+def user_token(user_id: str) -> str:
+    """
+    What the FTS index stores for user_id: its hex encoding, which the
+    tokenizer keeps as one token. Raw ids would be split at '.', '@' and
+    '-', so "alice" would also match "alice.smith" and "bob.alice".
+    Matches SQLite's hex(user_id) for the ASCII ids validate_user_id allows.
+    """
+    return user_id.encode().hex().upper()
+
+
+# SQL for user_token over transactions.user_id
+_USER_TOKEN_SQL = "hex(user_id)"
+
+
+def fts5_query(q: str, user_id: str | None = None) -> str:
+    """
+    'jane do' → '"jane"* "do"*' (FTS5 ANDs adjacent terms). With a user_id
+    the words must match the text columns and user_id the user's token:
+    'user_id : "616C696365" AND {description ...} : ("jane"* "do"*)'.
+    """
+    terms = " ".join(f'"{word}"*' for word in _words(q))
+    if user_id is None:
+        return terms
+    return f'user_id : "{user_token(user_id)}" AND {_FTS_TEXT_COLUMNS} : ({terms})'
+
+
+def tsquery(q: str) -> str:
+    """'jane do' → 'jane:* & do:*'."""
+    return " & ".join(f"{word}:*" for word in _words(q))
+
+
+def _fts_match(q: str, user_id: str):
+    return text("transactions_fts MATCH :fts_query").bindparams(fts_query=fts5_query(q, user_id))
+
+
+def _pg_tsquery(q: str):
+    return func.to_tsquery(literal_column("'simple'::regconfig"), tsquery(q))
+
+
+def match_clause(dialect: str, q: str, user_id: str = DEFAULT_USER_ID):
+    """Filter for Transaction queries that keeps only user_id's rows matching q."""
+    if not _words(q):
+        return false()
+    if dialect == "sqlite":
+        # The match is already exact to the user; a user_id filter here would
+        # make SQLite walk the user's rows through ix_transactions_user_*
+        return Transaction.id.in_(select(_fts.c.rowid).where(_fts_match(q, user_id)))
+    return and_(Transaction.user_id == user_id, transaction_search_vector.op("@@")(_pg_tsquery(q)))
+
+
+def ranked(session, q: str, limit: int, user_id: str = DEFAULT_USER_ID):
+    """user_id's best matches first, as (Transaction, score) pairs; higher scores are better."""
+    dialect = session.get_bind().dialect.name
+    if not _words(q):
+        return []
+    if dialect == "sqlite":
+        # Rank inside the FTS index and only then fetch the winning rows
+        bm25 = func.bm25(literal_column("transactions_fts"), *_FTS_WEIGHTS)
+        top = (
+            select(_fts.c.rowid.label("id"), (-bm25).label("score"))
+            .where(_fts_match(q, user_id))
+            .order_by(bm25, _fts.c.rowid.desc())
+            .limit(limit)
+            .subquery()
+        )
+        query = (
+            session.query(Transaction, top.c.score)
+            .join(top, top.c.id == Transaction.id)
+            .order_by(top.c.score.desc(), Transaction.id.desc())
+        )
+    else:
+        score = func.ts_rank(transaction_search_vector, _pg_tsquery(q))
+        query = (
+            session.query(Transaction, score.label("score"))
+            .filter(Transaction.user_id == user_id)
+            .filter(transaction_search_vector.op("@@")(_pg_tsquery(q)))
+            .order_by(score.desc(), Transaction.id.desc())
+        )
+    return query.limit(limit).all()
+
+
+def index_rows_sql(where: str) -> str:
+    """Add the transactions matching where to the SQLite FTS index."""
+    return f"""
+        INSERT INTO transactions_fts (rowid, description, counterparty, transaction_code, type, user_id)
+        SELECT id, description, counterparty, transaction_code, type, {_USER_TOKEN_SQL}
+        FROM transactions
+        WHERE {where}
+    """
+
+
+def rebuild(session):
+    """
+    Re-index every transaction. A no-op on PostgreSQL. FTS5's own 'rebuild'
+    would index the raw user ids, so empty the index and add every row.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        session.execute(text("INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')"))
+        session.execute(text(index_rows_sql("true")))
+        session.commit()
+
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    rebuild(session)
+    print("Rebuilt the transaction search index.")
+    session.close()
@@ -1,17 +1,155 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///mpesa.db")
 
+# Serve API reads from an async engine (aiosqlite / asyncpg) instead of
+# blocking sessions in the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Connection pool: persistent connections, extra ones allowed under bursts,
+# and how long a request waits for one before failing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite page cache per connection, in KiB
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", "65536"))
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_memory = is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
 connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
+pool_args = {}
+if is_sqlite:
     connect_args["check_same_thread"] = False
+if not is_memory:
+    pool_args = dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=not is_sqlite,
+        pool_recycle=-1 if is_sqlite else DB_POOL_RECYCLE,
+    )
 
 engine = create_engine(
     DATABASE_URL,
     echo=False,
     connect_args=connect_args,
+    **pool_args,
 )
 
-SessionLocal = sessionmaker(bind=engine)
\ No newline at end of file
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers keep going while an import is writing; NORMAL
+    # sync is durable across app crashes and much cheaper than FULL.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+if is_sqlite:
+    event.listen(engine, "connect", _sqlite_pragmas)
+
+SessionLocal = sessionmaker(bind=engine)
+
+
+def get_session():
+    """FastAPI dependency: one session per request, closed when it ends."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# ── Async engine ─────────────────────────────────────────────────────────────
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+_async_engine = None
+_async_session_factory = None
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """DATABASE_URL with its driver swapped for the async one (aiosqlite / asyncpg)."""
+    url = make_url(url)
+    return url.set(drivername=_ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """
+    The async engine, created on first use so the async drivers are only
+    needed when DB_ASYNC is on. Same pool settings and pragmas as engine.
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+        # aiosqlite would otherwise open a fresh connection (and thread) per checkout
+        async_pool_args = dict(pool_args, poolclass=AsyncAdaptedQueuePool) if pool_args else {}
+        _async_engine = create_async_engine(async_database_url(), echo=False, **async_pool_args)
+        if is_sqlite:
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_pragmas)
+    return _async_engine
+
+
+def async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_session_factory = async_sessionmaker(bind=get_async_engine())
+    return _async_session_factory
+
+
+async def dispose_async_engine():
+    """Close the async engine's pooled connections, if it was ever created."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
+
+async def get_db():
+    """
+    FastAPI dependency for endpoints that await the database: an
+    AsyncSession when DB_ASYNC is on, otherwise a regular Session whose
+    queries the Async* services run in the threadpool.
+    """
+    if DB_ASYNC:
+        async with async_session_factory()() as session:
+            yield session
+        return
+
+    from anyio import CapacityLimiter, to_thread
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        # Close outside the threadpool's limit (as FastAPI does for sync
+        # dependencies): if every worker thread is waiting for a pooled
+        # connection, the close that returns one must not queue behind them.
+        await to_thread.run_sync(session.close, limiter=CapacityLimiter(1))
+
+
+async def run_with_session(session, fn, *args, **kwargs):
+    """
+    Call fn(sync_session, *args, **kwargs) from async code. An AsyncSession
+    runs it through run_sync, so queries await the async driver on the
+    event loop; a plain Session runs it in a worker thread.
+    """
+    if hasattr(session, "run_sync"):
+        return await session.run_sync(fn, *args, **kwargs)
+
+    from functools import partial
+    from anyio import to_thread
+
+    return await to_thread.run_sync(partial(fn, session, *args, **kwargs))
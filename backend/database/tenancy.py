@@ -0,0 +1,64 @@
+"""
+Tenants
+=======
+Every transaction belongs to a user (tenant), identified by a short
+string. Queries, rollups, search, caches and chat sessions are all scoped
+to one user; nothing is aggregated across users.
+
+The API takes the user from the USER_ID_HEADER header (X-User-Id), but
+only with TRUST_USER_ID_HEADER set: the header is a bare claim, so it may
+only come from the proxy or gateway that authenticates users, and that
+proxy must drop any value the client sent. Untrusted, a request carrying
+the header is refused. Without it, and everywhere else (the CLI,
+benchmarks), the user is DEFAULT_USER_ID, so a single-user install works
+as before.
+
+The chat agent's tools can't take the user as an argument (the model
+picks their arguments), so whoever runs the agent wraps it in
+acting_as(user_id) and the tools read current_user().
+"""
+
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID", "default")
+
+# Request header naming the user, and whether to believe it. Only enable
+# behind a proxy that authenticates users and overwrites the header.
+USER_ID_HEADER = os.getenv("USER_ID_HEADER", "X-User-Id")
+TRUST_USER_ID_HEADER = os.getenv("TRUST_USER_ID_HEADER", "false").lower() in ("1", "true", "yes")
+
+# PostgreSQL only: when above zero, transactions is created as this many
+# hash partitions of user_id. Takes effect when the table is created.
+DB_TENANT_PARTITIONS = int(os.getenv("DB_TENANT_PARTITIONS", "0"))
+
+_USER_ID_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._@-]{0,63}")
+
+_acting_user = ContextVar("acting_user", default=None)
+
+
+def validate_user_id(user_id: str) -> str:
+    """user_id unchanged if it is a valid id. Raises ValueError otherwise."""
+    if not isinstance(user_id, str) or not _USER_ID_RE.fullmatch(user_id):
+        raise ValueError(
+            "Invalid user id: use 1-64 letters, digits, '.', '_', '@' or '-', "
+            "starting with a letter or digit."
+        )
+    return user_id
+
+
+def current_user() -> str:
+    """The user set by the innermost acting_as, else DEFAULT_USER_ID."""
+    return _acting_user.get() or DEFAULT_USER_ID
+
+
+@contextmanager
+def acting_as(user_id: str):
+    """Scope current_user() to user_id for the code run inside the block."""
+    token = _acting_user.set(validate_user_id(user_id))
+    try:
+        yield user_id
+    finally:
+        _acting_user.reset(token)
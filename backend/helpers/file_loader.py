@@ -1,18 +1,43 @@
+import csv
 import os
 import sys
-from pypdf import PdfReader
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pypdf import PageObject, PdfReader
+from pypdf.generic import ArrayObject, IndirectObject, NameObject
+import numpy as np
 import pandas as pd
 import re
 
+# Bump whenever parsing output changes — it invalidates cached statements
+PARSER_VERSION = "3"
 
+# Rows per DataFrame handed to the repository when streaming a statement
+INGEST_BATCH_SIZE = 5000
 
-def load_statements(file_path: str, password: str = None) -> str:
+# Opt-in parallel page extraction. Statements shorter than the threshold are
+# always extracted serially: below it, starting the pool and re-opening the
+# PDF in every worker costs more than the extraction it saves.
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+PARALLEL_PAGE_THRESHOLD = 32
+# Most pages a worker extracts per task, so each result stays small
+PAGES_PER_CHUNK = 16
+
+
+def load_statements(file_path: str, password: str = None, workers: int = None) -> str:
     """
-    Loads statements from a pdf or csv file.
+    Loads a pdf statement.
     Returns the raw text.
 
+    CSV statements have no text to parse; read them with load_csv or
+    iter_statement_batches.
+
     For encrypted M-PESA PDFs, pass the password (usually your national ID).
     If no password is provided and the PDF is encrypted, it will be prompted interactively.
+
+    workers > 1 extracts PDF pages in a process pool (defaults to
+    PDF_EXTRACT_WORKERS); see iter_pdf_pages.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found:{file_path}")
@@ -20,14 +45,16 @@ def load_statements(file_path: str, password: str = None) -> str:
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".pdf":
-        return _load_pdf(file_path, password)
+        return _load_pdf(file_path, password, workers)
     elif ext == ".csv":
-        return _load_csv(file_path)
+        raise ValueError("CSV statements are read as columns: use load_csv or iter_statement_batches")
     else:
         raise ValueError(f"Unsupported file type {ext}. Use .pdf or .csv")
 
-def _load_pdf(file_path: str, password: str = None) -> str:
-    reader = PdfReader(file_path)
+def _open_pdf(stream, password: str = None) -> PdfReader:
+    # Given a path, pypdf reads the whole file into memory; pass an open
+    # binary file to have it read objects as they are needed
+    reader = PdfReader(stream)
 
     # Handle encrypted / password-protected PDFs
     if reader.is_encrypted:
@@ -54,10 +81,126 @@ def _load_pdf(file_path: str, password: str = None) -> str:
                 )
             raise
 
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+    return reader
+
+
+# Attributes a page takes from its /Pages ancestors when it has none of its own
+_INHERITED_PAGE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _num_pages(reader: PdfReader) -> int:
+    # reader.pages would parse every page object just to count them
+    return int(reader.root_object["/Pages"]["/Count"])
+
+
+def _iter_page_refs(reader: PdfReader, node=None, inherit: dict = None):
+    """
+    Yield (reference, inherited attributes) for every page, in order,
+    walking the page tree lazily. Unlike reader.pages this builds no page
+    objects; each page's dictionary stays in the reader's cache until
+    _extract_page (or _forget) drops it.
+    """
+    if node is None:
+        node = reader.root_object["/Pages"].get_object()
+    inherit = {**(inherit or {}), **{a: node[a] for a in _INHERITED_PAGE_ATTRIBUTES if a in node}}
+    for kid in node["/Kids"]:
+        obj = kid.get_object()
+        if obj is None:
+            continue  # damaged file: invalid child in /Pages
+        if obj.get("/Type") == "/Pages" or ("/Type" not in obj and "/Kids" in obj):
+            yield from _iter_page_refs(reader, obj, inherit)
+        else:
+            yield kid, inherit
+
+
+def _forget(reader: PdfReader, ref):
+    reader.resolved_objects.pop((ref.generation, ref.idnum), None)
+
+
+def _extract_page(reader: PdfReader, ref, inherit: dict) -> str:
+    """Text of one page from _iter_page_refs; its parsed objects are dropped afterwards."""
+    page = PageObject(reader, ref)
+    page.update(ref.get_object())
+    for attr, value in inherit.items():
+        if attr not in page:
+            page[NameObject(attr)] = value
+    try:
+        return page.extract_text() or ""
+    finally:
+        contents = page.get("/Contents")
+        refs = [ref] + [c for c in (contents if isinstance(contents, ArrayObject) else [contents])
+                        if isinstance(c, IndirectObject)]
+        for obj_ref in refs:
+            _forget(reader, obj_ref)
+
+
+_worker_reader = None
+_worker_pages = None
+
+
+def _init_extract_worker(file_path: str, password: str):
+    """Pool initializer: open (and decrypt) the PDF once per worker process."""
+    global _worker_reader, _worker_pages
+    # Left open for the worker's lifetime; the pool exits with the statement
+    _worker_reader = _open_pdf(open(file_path, "rb"), password)
+    _worker_pages = list(_iter_page_refs(_worker_reader))
+    for ref, _ in _worker_pages:
+        _forget(_worker_reader, ref)
+
+
+def _extract_page_range(start: int, stop: int) -> list[str]:
+    return [_extract_page(_worker_reader, *_worker_pages[i]) for i in range(start, stop)]
+
+
+def iter_pdf_pages(file_path: str, password: str = None, workers: int = None):
+    """
+    Yield the text of each page, extracting lazily as the caller consumes.
+
+    The file is read from disk as pages are needed and each page's parsed
+    objects are released once its text is out, so memory does not grow
+    with the number of pages.
+
+    With workers > 1 and at least PARALLEL_PAGE_THRESHOLD pages, the page
+    range is split into chunks that a process pool extracts in parallel.
+    Each worker decrypts its own copy of the file; chunks are yielded back
+    in page order, with at most two per worker in flight so finished text
+    never piles up ahead of the caller.
+    """
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    with open(file_path, "rb") as stream:
+        reader = _open_pdf(stream, password)
+        n_pages = _num_pages(reader)
+
+        if workers <= 1 or n_pages < PARALLEL_PAGE_THRESHOLD:
+            for ref, inherit in _iter_page_refs(reader):
+                yield _extract_page(reader, ref, inherit)
+            return
+
+    # A few chunks per worker keeps the pool balanced and the output streaming
+    chunk = min(-(-n_pages // (workers * 4)), PAGES_PER_CHUNK)
+    ranges = ((start, min(start + chunk, n_pages)) for start in range(0, n_pages, chunk))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_extract_worker,
+        initargs=(file_path, password),
+    ) as pool:
+        in_flight = deque(pool.submit(_extract_page_range, *r) for r in islice(ranges, workers * 2))
+        while in_flight:
+            texts = in_flight.popleft().result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                in_flight.append(pool.submit(_extract_page_range, *next_range))
+            yield from texts
+
+
+def count_pdf_pages(file_path: str, password: str = None) -> int:
+    """Open (and decrypt) a PDF just far enough to count its pages."""
+    with open(file_path, "rb") as stream:
+        return _num_pages(_open_pdf(stream, password))
+
+
+def _load_pdf(file_path: str, password: str = None, workers: int = None) -> str:
+    return "".join(iter_pdf_pages(file_path, password, workers))
 
 
 def _to_float(val):
@@ -67,97 +210,377 @@ def _to_float(val):
     return float(str(val).replace(',', ''))
 
 
+# ── Precompiled patterns ──────────────────────────────────────────────────────
+_CODE_RE = re.compile(r'\bU[A-Z0-9]{9,}\b')
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+_MONEY_RE = re.compile(r'(-?\d{1,3}(?:,\d{3})*\.\d{2})')
+_STATUSES = frozenset(("Completed", "Failed", "Reversed", "Cancelled"))
+
+# Checked in order — the first rule with a matching keyword wins.
+_TYPE_RULES = (
+    (("Funds received",), "Received"),
+    (("Merchant Payment",), "Merchant Payment"),
+    (("Loan Repayment", "OD Loan Repayment"), "Fuliza Repayment"),
+    (("Bundle Purchase",), "Bundle Purchase"),
+    (("Pay Bill",), "Merchant Payment"),
+    (("Unit Trust Invest",), "Ziidi Investment"),
+    (("Customer Transfer",), "Money Transfer"),
+    (("Airtime Purchase",), "Airtime Purchase"),
+    (("C2B Transfer",), "Airtel Money Transfer"),
+    (("Unit Trust Withdraw",), "Ziidi Withdrawal"),
+    (("OverDraft of Credit Party",), "Amount Fulizad"),
+    (("Withdrawal Charge",), "Withdrawal Charge"),
+    (("Customer Withdrawal", "Agent Withdrawal", "Withdraw", "Cash Out"), "Withdrawal"),
+    (("Business Payment from",), "Received"),
+    (("Customer Payment to Small",), "Merchant Payment"),
+)
+
+
+def _classify(body_clean: str) -> str:
+    """Map the details text of a transaction to one of our transaction types."""
+    for keywords, tx_type in _TYPE_RULES:
+        for keyword in keywords:
+            if keyword in body_clean:
+                return tx_type
+    return "Other"
+
+
+def _counterparty(description: str | None) -> str | None:
+    # "Merchant Payment Online to 123456 - SUPERMARKET" → "SUPERMARKET"
+    _, dash, counterparty = (description or "").partition(" - ")
+    return (counterparty.strip() or None) if dash else None
+
+
+def _parse_body(code: str, body: str) -> dict:
+    """Build one structured record from a transaction code and the text after it."""
+    date_match = _DATE_RE.search(body)
+    date = date_match.group() if date_match else None
+
+    # Amount is the first money figure, balance the last one
+    figures = _MONEY_RE.findall(body)
+    amount = _to_float(figures[0]) if figures else 0.0
+    balance = _to_float(figures[-1]) if figures else 0.0
+
+    # Normalize body text — PDF extraction may split lines
+    body_clean = body.replace("\n", " ").replace("\r", " ")
+
+    # Details run from the completion time up to the status and the first
+    # figure. No earlier text can contain figures[0], or the regex would
+    # have matched there first, so a plain find locates it.
+    details_start = date_match.end() if date_match else 0
+    details_end = body_clean.find(figures[0], details_start) if figures else -1
+    words = body_clean[details_start:details_end if details_end >= 0 else None].split()
+    if words and words[-1] in _STATUSES:
+        words.pop()
+    description = " ".join(words) or None
+
+    # Classify on the transaction's own text. After its figures comes page
+    # furniture, e.g. the next page's "... Paid In Withdrawn Balance"
+    # header, which would otherwise match the "Withdraw" rule.
+    own_text = body_clean[:details_end] if details_end >= 0 else body_clean
+
+    return {
+        "Transaction Code": code,
+        "Date": date,
+        "Type": _classify(own_text),
+        "Amount": amount,
+        "Balance": balance,
+        "Description": description,
+        "Counterparty": _counterparty(description),
+    }
+
+
+def iter_mpesa_records(raw_text: str):
+    """
+    Walk the statement text once and yield one record per transaction.
+
+    Each transaction starts at its receipt code and runs up to the next code,
+    so a single pass over the code matches is enough to slice out every body.
+    """
+    previous = None
+    for match in _CODE_RE.finditer(raw_text):
+        if previous is not None:
+            yield _parse_body(previous.group(), raw_text[previous.end():match.start()])
+        previous = match
+    if previous is not None:
+        yield _parse_body(previous.group(), raw_text[previous.end():])
+
+
+def iter_page_records(pages):
+    """
+    Same as iter_mpesa_records, but over text that arrives page by page.
+
+    The last transaction of a page may continue on the next one, so its text
+    is carried over and re-scanned together with the following page.
+    """
+    carry = ""
+    for page in pages:
+        text = carry + page
+        previous = None
+        for match in _CODE_RE.finditer(text):
+            if previous is not None:
+                yield _parse_body(previous.group(), text[previous.end():match.start()])
+            previous = match
+        carry = text[previous.start():] if previous is not None else text
+    yield from iter_mpesa_records(carry)
+
+
 def clean_mpesa_text(raw_text: str):
+    return pd.DataFrame(list(iter_mpesa_records(raw_text)))
 
-    transactions = re.split(r'\bU[A-Z0-9]{9,}\b', raw_text)
-
-    codes = re.findall(r'\bU[A-Z0-9]{9,}\b', raw_text)
-
-    structured = []
-
-    for code, body in zip(codes, transactions[1:]):
-        #Extract date
-        date_match =re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', body)
-        date = date_match.group() if date_match else None
-
-        #Extract amount
-        amount_match = re.search(r'(-?\d{1,3}(?:,\d{3})*\.\d{2})',body)
-        amount = _to_float(amount_match.group()) if amount_match else 0.0
-
-        #extract balance
-        balance_match = re.findall(r'(-?\d{1,3}(?:,\d{3})*\.\d{2})', body)
-        balance = _to_float(balance_match[-1]) if balance_match else 0.0
-
-        # Normalize body text — PDF extraction may split lines
-        body_clean = body.replace("\n", " ").replace("\r", " ")
-
-        #Transaction type
-        if "Funds received" in body_clean:
-            tx_type ="Received"
-        elif "Merchant Payment" in body_clean:
-            tx_type = "Merchant Payment"
-        elif "Loan Repayment" in body_clean or "OD Loan Repayment" in body_clean:
-            tx_type = "Fuliza Repayment"
-        elif "Bundle Purchase" in body_clean:
-            tx_type = "Bundle Purchase"
-        elif "Pay Bill" in body_clean:
-            tx_type = "Merchant Payment"
-        elif "Unit Trust Invest" in body_clean:
-            tx_type = "Ziidi Investment"
-        elif "Customer Transfer" in body_clean:
-            tx_type = "Money Transfer"
-        elif "Airtime Purchase" in body_clean:
-            tx_type = "Airtime Purchase"
-        elif "C2B Transfer" in body_clean:
-            tx_type = "Airtel Money Transfer" 
-        elif "Unit Trust Withdraw" in body_clean:
-            tx_type = "Ziidi Withdrawal"
-        elif "OverDraft of Credit Party" in body_clean:
-            tx_type = "Amount Fulizad"
-        elif "Withdrawal Charge" in body_clean:
-            tx_type = "Withdrawal Charge"
-        elif "Customer Withdrawal" in body_clean or "Agent Withdrawal" in body_clean or "Withdraw" in body_clean or "Cash Out" in body_clean:
-            tx_type = "Withdrawal"
-        elif "Business Payment from" in body_clean:
-            tx_type = "Received"
-        elif "Customer Payment to Small" in body_clean:
-            tx_type = "Merchant Payment"
-        else:
-            tx_type ="Other"
-        
-        structured.append({
-            "Transaction Code": code,
-            "Date":date,
-            "Type":tx_type,
-            "Amount": amount,
-            "Balance": balance
-        })
-    return pd.DataFrame(structured)
 
 def consolidate_fuliza(df):
-    cleaned = []
+    """
+    Fold "Amount Fulizad" rows into the transaction they funded.
 
-    grouped = df.groupby("Transaction Code", sort =False)
+    Keeps the first row of every transaction code, records the summed
+    Fuliza amount for that code in "Fuliza used", and drops codes whose
+    first row is the artificial Fuliza inflow itself.
+    """
+    if df.empty:
+        return df.assign(**{"Fuliza used": pd.Series(dtype=float)})
 
-    for code, group in grouped:
+    codes = df["Transaction Code"]
+    is_fuliza = (df["Type"] == "Amount Fulizad").to_numpy()
+    fuliza_used = (
+        df["Amount"].where(is_fuliza, 0.0)
+        .groupby(codes, sort=False)
+        .transform("sum")
+        .to_numpy()
+    )
 
-        row = group.iloc[0].copy()
-        row["Fuliza used"] = 0.0
+    # Remove the artificial positive inflow
+    first = ~codes.duplicated().to_numpy()
+    keep = first & ~is_fuliza
 
-        if "Amount Fulizad" in group["Type"].values:
-            fuliza_amount = group.loc[
-                group["Type"] == "Amount Fulizad", "Amount"
-            ].sum()
+    cleaned = df.loc[keep].copy()
+    cleaned["Fuliza used"] = fuliza_used[keep].astype(float)
+    return cleaned
 
-            row["Fuliza used"] = fuliza_amount
 
-            # Remove the artificial positive inflow
-            if row["Type"] == "Amount Fulizad":
-                continue
+def _iter_consolidated(frames):
+    """
+    Run consolidate_fuliza over a stream of frames.
+
+    Fuliza rows share their parent's code and sit right next to it, so the
+    trailing run of the last code is held back until the next frame arrives.
+    """
+    pending = None
+    for frame in frames:
+        if pending is not None:
+            frame = pd.concat([pending, frame], ignore_index=True)
+        codes = frame["Transaction Code"].to_numpy()
+        differs = np.flatnonzero(codes != codes[-1])
+        cut = differs[-1] + 1 if len(differs) else 0
+        pending = frame.iloc[cut:]
+        if cut:
+            yield consolidate_fuliza(frame.iloc[:cut])
+    if pending is not None:
+        yield consolidate_fuliza(pending)
+
+
+def _notify_each(iterable, callback):
+    for item in iterable:
+        yield item
+        callback()
+
+
+def _chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# ── CSV statements ────────────────────────────────────────────────────────────
+# CSV exports already have one transaction per row, so they skip the text
+# pass entirely: chunks are read with money columns typed as floats and
+# turned into the same records the PDF parser produces, with no regex.
+
+# Read CSVs with pyarrow's streaming reader when it is installed ("auto"),
+# or force "pyarrow" / "pandas"
+CSV_ENGINE = os.getenv("CSV_ENGINE", "auto")
+
+# Header (case-insensitive) → our name for each column we read
+_CSV_COLUMNS = {
+    "receipt no.": "Transaction Code",
+    "completion time": "Date",
+    "details": "Details",
+    "paid in": "Paid In",
+    "withdrawn": "Withdrawn",
+    "balance": "Balance",
+}
+_CSV_MONEY = ("Paid In", "Withdrawn", "Balance")
+_RECORD_COLUMNS = ["Transaction Code", "Date", "Type", "Amount", "Balance", "Description", "Counterparty"]
+# Exports may start with a few lines of account details before the header
+_CSV_HEADER_SEARCH_LINES = 20
+
+
+def _csv_header(file_path: str):
+    """Line number of the column header, and {header as written: our name}."""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        for line_no, row in enumerate(csv.reader(f)):
+            if line_no >= _CSV_HEADER_SEARCH_LINES:
+                break
+            names = {name: _CSV_COLUMNS[name.strip().lower()] for name in row if name.strip().lower() in _CSV_COLUMNS}
+            if "Transaction Code" in names.values():
+                missing = set(_CSV_COLUMNS.values()) - set(names.values())
+                if missing:
+                    raise ValueError(f"CSV statement is missing columns: {', '.join(sorted(missing))}")
+                return line_no, names
+    raise ValueError("Not an M-PESA statement CSV: no 'Receipt No.' column header found")
+
+
+def _csv_records(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Records, as _parse_body builds them, from a chunk of CSV columns: money
+    as floats, code and date trimmed.
+    """
+    # Text columns go through the PDF path's own helpers, a plain loop per
+    # row: it beats pandas' object-dtype .str methods, which loop anyway
+    details = frame["Details"].fillna("").to_numpy()
+    descriptions = [" ".join(text.split()) or None for text in details]
+
+    # Withdrawals are negative on the statement, however the export signs
+    # them; the unused column may be blank or 0.00
+    paid_in = frame["Paid In"].fillna(0.0)
+    amount = paid_in.where(paid_in != 0, -frame["Withdrawn"].fillna(0.0).abs())
+    date = frame["Date"]
+
+    return pd.DataFrame({
+        "Transaction Code": frame["Transaction Code"],
+        "Date": date.where(date != "", None),
+        "Type": [_classify(description or "") for description in descriptions],
+        "Amount": amount.to_numpy(dtype=float),
+        "Balance": frame["Balance"].fillna(0.0).to_numpy(dtype=float),
+        "Description": descriptions,
+        "Counterparty": [_counterparty(description) for description in descriptions],
+    })
+
+
+def _iter_csv_frames_pandas(file_path: str, header_line: int, names: dict, batch_size: int):
+    reader = pd.read_csv(
+        file_path,
+        skiprows=header_line,
+        usecols=list(names),
+        dtype={name: float if ours in _CSV_MONEY else str for name, ours in names.items()},
+        thousands=",",
+        keep_default_na=False,
+        na_values={name: [""] for name, ours in names.items() if ours in _CSV_MONEY},
+        encoding="utf-8-sig",
+        chunksize=batch_size,
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns=names)
+        for column in ("Transaction Code", "Date"):
+            chunk[column] = chunk[column].str.strip()
+        yield chunk
+
+
+def _iter_csv_frames_pyarrow(file_path: str, header_line: int, names: dict, batch_size: int):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+
+    money = [name for name, ours in names.items() if ours in _CSV_MONEY]
+    trimmed = [name for name, ours in names.items() if ours in ("Transaction Code", "Date")]
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(skip_rows=header_line, encoding="utf8"),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(names),
+            # Read everything as text; figures have thousands separators
+            column_types={name: pa.string() for name in names},
+            strings_can_be_null=True,
+            null_values=[""],
+        ),
+    )
+
+    def to_frame(table):
+        for name in money:
+            figures = pc.replace_substring(table[name], ",", "").cast(pa.float64())
+            table = table.set_column(table.schema.get_field_index(name), name, figures)
+        for name in trimmed:
+            text = pc.utf8_trim_whitespace(table[name])
+            table = table.set_column(table.schema.get_field_index(name), name, text)
+        return table.to_pandas().rename(columns=names)
+
+    pending = []
+    pending_rows = 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= batch_size:
+            table = pa.Table.from_batches(pending)
+            for start in range(0, table.num_rows - batch_size + 1, batch_size):
+                yield to_frame(table.slice(start, batch_size))
+            rest = table.slice(table.num_rows - table.num_rows % batch_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield to_frame(pa.Table.from_batches(pending))
+
+
+def _csv_engine() -> str:
+    if CSV_ENGINE != "auto":
+        return CSV_ENGINE
+    try:
+        import pyarrow.csv  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "pandas"
+
+
+def iter_csv_records(file_path: str, batch_size: int = INGEST_BATCH_SIZE):
+    """
+    Stream an M-PESA CSV statement as frames of about batch_size records,
+    with the same columns and values clean_mpesa_text gives for the PDF.
+    """
+    header_line, names = _csv_header(file_path)
+    if _csv_engine() == "pyarrow":
+        frames = _iter_csv_frames_pyarrow(file_path, header_line, names, batch_size)
+    else:
+        frames = _iter_csv_frames_pandas(file_path, header_line, names, batch_size)
+    for frame in frames:
+        yield _csv_records(frame)
+
+
+def load_csv(file_path: str) -> pd.DataFrame:
+    """All records of a CSV statement in one frame (not yet consolidated)."""
+    frames = list(iter_csv_records(file_path))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_RECORD_COLUMNS)
 
-        cleaned.append(row)
 
-    return pd.DataFrame(cleaned)
+def iter_statement_batches(
+    file_path: str,
+    password: str = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    workers: int = None,
+    on_page=None,
+):
+    """
+    Stream a statement as consolidated DataFrames of about batch_size rows.
+
+    PDF pages are extracted lazily and CSVs read in chunks, and each batch
+    is ready for TransactionRepository.add_bulk, so memory stays flat however
+    long the statement is. on_page, if given, is called after each PDF page
+    is extracted; CSVs have no pages (and no password).
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found:{file_path}")
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv":
+        yield from _iter_consolidated(iter_csv_records(file_path, batch_size))
+        return
+    if ext != ".pdf":
+        raise ValueError(f"Unsupported file type {ext}. Use .pdf or .csv")
+
+    pages = iter_pdf_pages(file_path, password, workers)
+    if on_page is not None:
+        pages = _notify_each(pages, on_page)
+
+    records = iter_page_records(pages)
+    frames = (pd.DataFrame(chunk) for chunk in _chunked(records, batch_size))
+    yield from _iter_consolidated(frames)
 
 
 if __name__ == "__main__":
@@ -166,8 +589,10 @@ if __name__ == "__main__":
         sys.exit(1)
 
     file_path = sys.argv[1]
-    raw = load_statements(file_path)
-    df = clean_mpesa_text(raw)
+    if file_path.lower().endswith(".csv"):
+        df = load_csv(file_path)
+    else:
+        df = clean_mpesa_text(load_statements(file_path))
     df = consolidate_fuliza(df)
 
     print(df.head(20))
\ No newline at end of file
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+import pandas as pd
+
+from helpers.file_loader import PARSER_VERSION, iter_statement_batches
+
+STATEMENT_CACHE_DIR = os.getenv("STATEMENT_CACHE_DIR", ".statement_cache")
+STATEMENT_CACHE_MAX_BYTES = int(os.getenv("STATEMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class StatementCache:
+    """
+    Content-addressed on-disk cache of parsed statements.
+
+    Entries are keyed by a hash of the uploaded bytes, the password and the
+    parser version, and hold the consolidated batches exactly as they were
+    handed to add_bulk (gzipped pickles, one file per batch). Least recently
+    used entries are evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = STATEMENT_CACHE_DIR, max_bytes: int = STATEMENT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, file_path: str, password: str = None) -> str:
+        # The password is part of the key so a hit never bypasses decryption
+        digest = hashlib.sha256(f"{PARSER_VERSION}\0{password or ''}\0".encode())
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self, key: str):
+        """
+        Return an iterator over the cached batches, or None on a miss.
+
+        Every batch file is opened before the lock is released, so an
+        eviction while the batches are being imported can't pull them out
+        from under add_bulk (open files outlive their directory).
+        """
+        entry = os.path.join(self.directory, key)
+        with self._lock:
+            handles = []
+            try:
+                os.utime(entry)  # mark as recently used
+                for part in sorted(os.listdir(entry)):
+                    handles.append(open(os.path.join(entry, part), "rb"))
+            except OSError:
+                for handle in handles:
+                    handle.close()
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._read(handles)
+
+    @staticmethod
+    def _read(handles):
+        try:
+            for handle in handles:
+                with handle:
+                    yield pd.read_pickle(handle, compression="gzip")
+        finally:
+            for handle in handles:
+                handle.close()
+
+    def store_through(self, key: str, batches):
+        """
+        Pass batches through while writing them to the cache. The entry only
+        becomes visible once every batch has been consumed.
+        """
+        staging = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            for i, batch in enumerate(batches):
+                batch.to_pickle(os.path.join(staging, f"{i:06d}.pkl.gz"), compression="gzip")
+                yield batch
+            with self._lock:
+                try:
+                    os.rename(staging, os.path.join(self.directory, key))
+                except OSError:
+                    pass  # another upload of the same statement got there first
+                self._evict()
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def iter_batches(self, file_path: str, password: str = None, **kwargs):
+        """
+        Consolidated batches for a statement, from the cache when possible.
+        Returns (batches, hit); kwargs go to iter_statement_batches on a miss.
+        """
+        key = self.key(file_path, password)
+        cached = self.load(key)
+        if cached is not None:
+            return cached, True
+        return self.store_through(key, iter_statement_batches(file_path, password, **kwargs)), False
+
+    def stats(self):
+        with self._lock:
+            entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _entries(self):
+        """(path, size, last_used) of every committed entry."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(f.stat().st_size for f in os.scandir(path))
+            entries.append((path, size, os.stat(path).st_mtime))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+# ── Shared cache used by the API and CLI ─────────────────────────────────────
+statement_cache = StatementCache()
@@ -1,16 +1,24 @@
-from helpers.file_loader import load_statements, clean_mpesa_text, consolidate_fuliza
-from database.session import engine
+from database.session import engine, SessionLocal
 from database.models import Base
+from database import rollups
 from database.repository import TransactionRepository
-from agents.analysing_agent import build_finance_agent
 import sys
 import os
+import threading
 from colorama import Fore, Style, init
 
 init(autoreset=True)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
+def _import_agent():
+    # LangChain takes about a second to import. Do it in the background
+    # while the user picks a file and the statement loads; it shares no
+    # modules with the parser (pandas, pypdf), so the two don't contend
+    # for import locks.
+    import agents.analysing_agent  # noqa: F401
+
+
 def main():
     print(f"""
 {Fore.CYAN}
@@ -21,8 +29,13 @@ def main():
 ╚═══════════════════════════════════════════════════════╝
 {Style.RESET_ALL}""")
 
+    agent_import = threading.Thread(target=_import_agent, daemon=True)
+    agent_import.start()
+
     # ── Step 1: Load data into DB ────────────────────────────────────────────
     Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        rollups.ensure_built(session)
 
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
@@ -34,17 +47,20 @@ def main():
         sys.exit(1)
 
     print(f"{Fore.YELLOW}ℹ️  Loading M-PESA statement from {file_path}...{Style.RESET_ALL}")
-    raw = load_statements(file_path)
-    df = clean_mpesa_text(raw)
-    df = consolidate_fuliza(df)
-
+    from helpers.statement_cache import statement_cache
     repo = TransactionRepository()
-    repo.add_bulk(df)
+    loaded = 0
+    batches, _ = statement_cache.iter_batches(file_path)
+    for batch in batches:
+        repo.add_bulk(batch)
+        loaded += len(batch)
     repo.close()
-    print(f"{Fore.GREEN}✅ {len(df)} transactions loaded into database.{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}✅ {loaded} transactions loaded into database.{Style.RESET_ALL}")
 
     # ── Step 2: Build the AI Agent ───────────────────────────────────────────
     print(f"{Fore.YELLOW}ℹ️  Building Finance Agent...{Style.RESET_ALL}")
+    agent_import.join()
+    from agents.analysing_agent import build_finance_agent
     agent = build_finance_agent()
     print(f"{Fore.GREEN}✅ Agent ready!{Style.RESET_ALL}\n")
 
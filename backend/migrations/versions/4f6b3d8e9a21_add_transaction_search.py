@@ -0,0 +1,53 @@
+"""add transaction descriptions and search index
+
+Revision ID: 4f6b3d8e9a21
+Revises: e2a9c04f7b18
+Create Date: 2026-10-18 14:21:33.160487
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '4f6b3d8e9a21'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c04f7b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Inlined from database/models.py so this revision stays stable
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, counterparty, transaction_code, type, "
+    "content='transactions', content_rowid='id', prefix='2 3')"
+)
+POSTGRES_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search ON transactions USING gin ("
+    "to_tsvector('simple'::regconfig, (((((coalesce(description, '') || ' ') || "
+    "coalesce(counterparty, '')) || ' ') || transaction_code) || ' ') || type))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("transactions")}
+    for name in ("description", "counterparty"):
+        if name not in columns:
+            op.add_column("transactions", sa.Column(name, sa.String(), nullable=True))
+
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(SQLITE_FTS)
+        op.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    else:
+        op.execute(POSTGRES_INDEX)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+    else:
+        op.execute("DROP INDEX IF EXISTS ix_transactions_search")
+    op.drop_column("transactions", "counterparty")
+    op.drop_column("transactions", "description")
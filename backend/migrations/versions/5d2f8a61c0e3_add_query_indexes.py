@@ -0,0 +1,36 @@
+"""add query indexes
+
+Revision ID: 5d2f8a61c0e3
+Revises: 1bef9b5cf368
+Create Date: 2026-10-18 09:12:40.318224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '5d2f8a61c0e3'
+down_revision: Union[str, Sequence[str], None] = '1bef9b5cf368'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, columns) — mirrors Transaction.__table_args__
+INDEXES = [
+    ("ix_transactions_date_id", ["date", "id"]),
+    ("ix_transactions_amount_type", ["amount", "type"]),
+    ("ix_transactions_type_amount", ["type", "amount"]),
+    ("ix_transactions_fuliza_used_date", ["fuliza_used", "date"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in INDEXES:
+        op.create_index(name, "transactions", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="transactions", if_exists=True)
@@ -0,0 +1,186 @@
+"""add user_id to transactions and daily rollups
+
+Revision ID: 7b3e91c4d0f2
+Revises: 4f6b3d8e9a21
+Create Date: 2026-10-18 16:02:47.391225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '7b3e91c4d0f2'
+down_revision: Union[str, Sequence[str], None] = '4f6b3d8e9a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows belong to the single user the app had so far. Inlined from
+# database/tenancy.py, like everything below, so this revision stays stable.
+DEFAULT_USER_ID = "default"
+
+OLD_INDEXES = (
+    "ix_transactions_date_id",
+    "ix_transactions_amount_type",
+    "ix_transactions_type_amount",
+    "ix_transactions_fuliza_used_date",
+    "ix_transactions_type_date_id",
+)
+NEW_INDEXES = {
+    "ix_transactions_user_date_id": ["user_id", "date", "id"],
+    "ix_transactions_user_amount_type": ["user_id", "amount", "type"],
+    "ix_transactions_user_type_amount": ["user_id", "type", "amount"],
+    "ix_transactions_user_fuliza_used_date": ["user_id", "fuliza_used", "date"],
+    "ix_transactions_user_type_date_id": ["user_id", "type", "date", "id"],
+}
+COLUMNS = "id, transaction_code, date, type, amount, balance, fuliza_used, description, counterparty"
+
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, counterparty, transaction_code, type, user_id, "
+    "content='transactions', content_rowid='id', prefix='2 3')"
+)
+SQLITE_FTS_BEFORE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, counterparty, transaction_code, type, "
+    "content='transactions', content_rowid='id', prefix='2 3')"
+)
+
+ROLLUP_TOTALS = """
+           COUNT(*),
+           COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0),
+           COUNT(CASE WHEN amount > 0 THEN 1 END),
+           COALESCE(SUM(CASE WHEN amount < 0 THEN amount END), 0),
+           COUNT(CASE WHEN amount < 0 THEN 1 END),
+           COALESCE(SUM(CASE WHEN fuliza_used > 0 THEN fuliza_used END), 0),
+           COUNT(CASE WHEN fuliza_used > 0 THEN 1 END)
+"""
+ROLLUP_NAMES = ("day, type, tx_count, inflow_total, inflow_count, outflow_total, "
+                "outflow_count, fuliza_used_total, fuliza_used_count")
+
+
+def _rollup_columns():
+    return [
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.Column("inflow_total", sa.Float(), nullable=False),
+        sa.Column("inflow_count", sa.Integer(), nullable=False),
+        sa.Column("outflow_total", sa.Float(), nullable=False),
+        sa.Column("outflow_count", sa.Integer(), nullable=False),
+        sa.Column("fuliza_used_total", sa.Float(), nullable=False),
+        sa.Column("fuliza_used_count", sa.Integer(), nullable=False),
+    ]
+
+
+def _transactions_table(name: str, with_user: bool):
+    columns = [
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("transaction_code", sa.String(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("fuliza_used", sa.Float(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("counterparty", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    ]
+    if with_user:
+        columns += [
+            sa.Column("user_id", sa.String(), nullable=False, server_default=DEFAULT_USER_ID),
+            sa.UniqueConstraint("user_id", "transaction_code", name="uq_transactions_user_code"),
+        ]
+    else:
+        columns.append(sa.UniqueConstraint("transaction_code"))
+    op.create_table(name, *columns)
+
+
+def _rebuild_sqlite(with_user: bool):
+    """SQLite can't drop the unnamed UNIQUE (transaction_code), so copy the table."""
+    op.execute("DROP TABLE IF EXISTS transactions_fts")
+    _transactions_table("transactions_new", with_user)
+    op.execute(f"INSERT INTO transactions_new ({COLUMNS}) SELECT {COLUMNS} FROM transactions")
+    op.drop_table("transactions")
+    op.rename_table("transactions_new", "transactions")
+    op.execute(SQLITE_FTS if with_user else SQLITE_FTS_BEFORE)
+    op.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+
+def _rebuild_rollups(with_user: bool):
+    op.drop_table("daily_rollups")
+    if with_user:
+        op.create_table(
+            "daily_rollups",
+            sa.Column("user_id", sa.String(), nullable=False),
+            *_rollup_columns(),
+            sa.PrimaryKeyConstraint("user_id", "day", "type"),
+        )
+        op.execute(f"""
+            INSERT INTO daily_rollups (user_id, {ROLLUP_NAMES})
+            SELECT user_id, date(date), type, {ROLLUP_TOTALS}
+            FROM transactions
+            GROUP BY user_id, date(date), type
+        """)
+    else:
+        op.create_table(
+            "daily_rollups",
+            *_rollup_columns(),
+            sa.PrimaryKeyConstraint("day", "type"),
+        )
+        op.execute(f"""
+            INSERT INTO daily_rollups ({ROLLUP_NAMES})
+            SELECT date(date), type, {ROLLUP_TOTALS}
+            FROM transactions
+            GROUP BY date(date), type
+        """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Databases created by Base.metadata.create_all() may already have it
+    if "user_id" in {c["name"] for c in sa.inspect(bind).get_columns("transactions")}:
+        return
+
+    for name in OLD_INDEXES:
+        op.drop_index(name, table_name="transactions", if_exists=True)
+    if bind.dialect.name == "sqlite":
+        _rebuild_sqlite(with_user=True)
+    else:
+        op.add_column("transactions", sa.Column(
+            "user_id", sa.String(), nullable=False, server_default=DEFAULT_USER_ID))
+        op.drop_constraint("transactions_transaction_code_key", "transactions", type_="unique")
+        op.create_unique_constraint("uq_transactions_user_code", "transactions", ["user_id", "transaction_code"])
+    for name, columns in NEW_INDEXES.items():
+        op.create_index(name, "transactions", columns)
+    _rebuild_rollups(with_user=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    others = bind.exec_driver_sql(
+        f"SELECT COUNT(*) FROM transactions WHERE user_id <> '{DEFAULT_USER_ID}'"
+    ).scalar()
+    if others:
+        raise RuntimeError(
+            f"{others} transactions belong to users other than '{DEFAULT_USER_ID}'; "
+            "remove them before downgrading to the single-user schema."
+        )
+
+    for name in NEW_INDEXES:
+        op.drop_index(name, table_name="transactions", if_exists=True)
+    if bind.dialect.name == "sqlite":
+        _rebuild_sqlite(with_user=False)
+    else:
+        op.drop_constraint("uq_transactions_user_code", "transactions", type_="unique")
+        op.create_unique_constraint("transactions_transaction_code_key", "transactions", ["transaction_code"])
+        op.drop_column("transactions", "user_id")
+    op.create_index("ix_transactions_date_id", "transactions", ["date", "id"])
+    op.create_index("ix_transactions_amount_type", "transactions", ["amount", "type"])
+    op.create_index("ix_transactions_type_amount", "transactions", ["type", "amount"])
+    op.create_index("ix_transactions_fuliza_used_date", "transactions", ["fuliza_used", "date"])
+    op.create_index("ix_transactions_type_date_id", "transactions", ["type", "date", "id"])
+    _rebuild_rollups(with_user=False)
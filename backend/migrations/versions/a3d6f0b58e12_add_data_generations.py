@@ -0,0 +1,34 @@
+"""add data generations
+
+Revision ID: a3d6f0b58e12
+Revises: c5a8e2d47f19
+Create Date: 2026-10-19 15:42:08.319574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a3d6f0b58e12'
+down_revision: Union[str, Sequence[str], None] = 'c5a8e2d47f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by Base.metadata.create_all() may already have the table
+    if not sa.inspect(op.get_bind()).has_table("data_generations"):
+        op.create_table(
+            "data_generations",
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("generation", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("data_generations")
@@ -0,0 +1,41 @@
+"""index user tokens in the SQLite search index
+
+Revision ID: c5a8e2d47f19
+Revises: 7b3e91c4d0f2
+Create Date: 2026-10-19 10:14:52.806413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'c5a8e2d47f19'
+down_revision: Union[str, Sequence[str], None] = '7b3e91c4d0f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# transactions_fts.user_id held the raw ids, which FTS5 splits at '.', '@'
+# and '-'; it now holds hex(user_id), one token per user. Inlined from
+# database/search.py so this revision stays stable. PostgreSQL is unaffected.
+INDEX_ROWS = """
+    INSERT INTO transactions_fts (rowid, description, counterparty, transaction_code, type, user_id)
+    SELECT id, description, counterparty, transaction_code, type, {user_id}
+    FROM transactions
+"""
+
+
+def _reindex(user_id: str):
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')")
+        op.execute(INDEX_ROWS.format(user_id=user_id))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _reindex("hex(user_id)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _reindex("user_id")
@@ -0,0 +1,27 @@
+"""add type/date keyset index
+
+Revision ID: e2a9c04f7b18
+Revises: 9c4e7b1d2a65
+Create Date: 2026-10-18 12:37:09.514820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'e2a9c04f7b18'
+down_revision: Union[str, Sequence[str], None] = '9c4e7b1d2a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pages of /api/transactions filtered by type
+    op.create_index("ix_transactions_type_date_id", "transactions", ["type", "date", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_type_date_id", table_name="transactions", if_exists=True)
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from database.tenancy import DEFAULT_USER_ID, acting_as
+
+# Chat sessions kept in memory at once, and how long an idle one survives
+AGENT_POOL_MAX_SESSIONS = int(os.getenv("AGENT_POOL_MAX_SESSIONS", "200"))
+AGENT_SESSION_TTL_SECONDS = int(os.getenv("AGENT_SESSION_TTL_SECONDS", "1800"))
+
+
+class _ChatSession:
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class AgentPool:
+    """
+    One finance agent (and so one conversation memory) per chat session.
+    Sessions belong to the user who started them: the same session id sent
+    by another user is a different conversation. Sessions idle for longer than ttl_seconds are dropped, and past
+    max_sessions the least recently used one goes. A session answers one
+    message at a time; concurrent messages to it wait their turn.
+    """
+
+    def __init__(self, build_agent=None, max_sessions: int = AGENT_POOL_MAX_SESSIONS,
+                 ttl_seconds: int = AGENT_SESSION_TTL_SECONDS):
+        self.build_agent = build_agent
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    def _build(self):
+        if self.build_agent is None:
+            from agents.analysing_agent import build_finance_agent
+            self.build_agent = build_finance_agent
+        return self.build_agent()
+
+    def _evict(self, now: float):
+        # Oldest first, so expired sessions sit at the front of the LRU order
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if now - session.last_used > self.ttl_seconds:
+                self.expired += 1
+            elif len(self._sessions) > self.max_sessions:
+                self.evicted += 1
+            else:
+                break
+            del self._sessions[key]
+
+    def _get(self, key) -> _ChatSession:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(key)
+            if session is not None:
+                session.last_used = now
+                self._sessions.move_to_end(key)
+                return session
+
+        # Build outside the lock; if two requests race, the first one wins
+        session = _ChatSession(self._build())
+        with self._lock:
+            existing = self._sessions.get(key)
+            if existing is not None:
+                return existing
+            self.created += 1
+            self._sessions[key] = session
+            self._evict(now)
+        return session
+
+    @contextmanager
+    def checkout(self, session_id: str, user_id: str = DEFAULT_USER_ID):
+        """
+        user_id's agent for session_id, held exclusively for one message.
+        Inside the block the agent's tools read user_id's data.
+        """
+        session = self._get((user_id, session_id))
+        with session.lock, acting_as(user_id):
+            try:
+                yield session.agent
+            finally:
+                session.last_used = time.monotonic()
+
+    def discard(self, session_id: str, user_id: str = DEFAULT_USER_ID) -> bool:
+        """Forget one of user_id's conversations. Returns whether it existed."""
+        with self._lock:
+            return self._sessions.pop((user_id, session_id), None) is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+
+# ── Shared pool used by the API ──────────────────────────────────────────────
+agent_pool = AgentPool()
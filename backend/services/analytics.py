@@ -1,57 +1,131 @@
-from database.repository import TransactionRepository
-from sqlalchemy import func, extract
-from database.session import SessionLocal
-from database.models import Transaction
+import os
+from datetime import datetime
+from sqlalchemy import func, extract, case, literal, null, cast, Date, DateTime, Float, Integer, String
+from database.session import SessionLocal, run_with_session
+from database.models import Transaction, DailyRollup
+from database.tenancy import DEFAULT_USER_ID
+from services.downsample import lttb_indices
+
+# Where analytics come from: "sql" (rollups and indexed queries) or
+# "columnar" (in-memory column arrays, see services/columnar_analytics.py)
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "sql").lower()
 
 
 class AnalyticsService:
+    """
+    Dashboard analytics for one user. Totals, categories and time series are read from the
+    daily_rollups table (see database/rollups.py), so they cost O(days);
+    only top_transactions needs the raw transactions.
 
-    def __init__(self):
-        self.repo = TransactionRepository()
+    Like TransactionRepository it works on one session: the request's when
+    given, otherwise its own, released by close().
+    """
 
-    def summary(self):
-        """Returns 6 KPI fields for the dashboard."""
-        session = SessionLocal()
+    # time_series metrics: (value, count of the rows it sums) per rollup row.
+    # Outflow is the amount spent, positive; net is inflow minus that.
+    SERIES_METRICS = {
+        "inflow": (DailyRollup.inflow_total, DailyRollup.inflow_count),
+        "outflow": (-DailyRollup.outflow_total, DailyRollup.outflow_count),
+        "net": (DailyRollup.inflow_total + DailyRollup.outflow_total, DailyRollup.tx_count),
+        "fuliza": (DailyRollup.fuliza_used_total, DailyRollup.fuliza_used_count),
+    }
+    SERIES_BUCKETS = ("day", "week", "month")
 
-        total_inflow = session.query(
-            func.sum(Transaction.amount)
-        ).filter(Transaction.amount > 0).scalar() or 0.0
+    def __init__(self, session=None, user_id: str = DEFAULT_USER_ID):
+        self._owns_session = session is None
+        self.session = SessionLocal() if session is None else session
+        self.user_id = user_id
 
-        lifestyle_outflow = session.query(
-            func.sum(Transaction.amount)
-        ).filter(Transaction.amount < 0).scalar() or 0.0
+    def close(self):
+        if self._owns_session:
+            self.session.close()
 
-        fuliza_used = session.query(
-            func.sum(Transaction.fuliza_used)
-        ).filter(Transaction.fuliza_used > 0).scalar() or 0.0
+    # ── Shared query pieces ───────────────────────────────────────────────────
+    @staticmethod
+    def _kpis(session, user_id):
+        """One pass over user_id's rollups for every KPI."""
+        rollup = DailyRollup
+        # sum(abs(amount)) for a type is its inflow minus its (negative) outflow
+        moved = rollup.inflow_total - rollup.outflow_total
+        return session.query(
+            func.sum(rollup.inflow_total).label("inflow"),
+            func.sum(rollup.outflow_total).label("outflow"),
+            func.sum(rollup.fuliza_used_total).label("fuliza_used"),
+            func.sum(rollup.fuliza_used_count).label("fuliza_count"),
+            func.sum(case((rollup.type == "Fuliza Repayment", moved))).label("fuliza_repaid"),
+            func.sum(case((rollup.type == "Merchant Payment", moved))).label("merchant_spend"),
+        ).filter(rollup.user_id == user_id).one()
 
-        fuliza_repaid = session.query(
-            func.sum(func.abs(Transaction.amount))
-        ).filter(Transaction.type == "Fuliza Repayment").scalar() or 0.0
+    @staticmethod
+    def _categories_query(session, user_id):
+        return session.query(
+            DailyRollup.type.label("type"),
+            func.sum(DailyRollup.outflow_total).label("total"),
+            func.sum(DailyRollup.outflow_count).label("count"),
+        ).filter(DailyRollup.user_id == user_id).group_by(DailyRollup.type).having(func.sum(DailyRollup.outflow_count) > 0)
 
-        merchant_spend = session.query(
-            func.sum(func.abs(Transaction.amount))
-        ).filter(Transaction.type == "Merchant Payment").scalar() or 0.0
-
-        session.close()
+    @staticmethod
+    def _summary_from(kpis):
+        total_inflow = kpis.inflow or 0.0
+        lifestyle_outflow = kpis.outflow or 0.0
         return {
             "total_inflow": round(total_inflow, 2),
             "lifestyle_outflow": round(abs(lifestyle_outflow), 2),
             "net": round(total_inflow + lifestyle_outflow, 2),
-            "fuliza_used": round(fuliza_used, 2),
-            "fuliza_repaid": round(fuliza_repaid, 2),
-            "merchant_spend": round(merchant_spend, 2),
+            "fuliza_used": round(kpis.fuliza_used or 0.0, 2),
+            "fuliza_repaid": round(kpis.fuliza_repaid or 0.0, 2),
+            "merchant_spend": round(kpis.merchant_spend or 0.0, 2),
+        }
+
+    @staticmethod
+    def _fuliza_from(kpis):
+        """Fuliza totals only; the per-day history is time_series("fuliza"), which caps its points."""
+        fuliza_used_total = round(kpis.fuliza_used or 0, 2)
+        total_inflow = kpis.inflow or 1  # avoid div-by-zero
+        return {
+            "fuliza_used_total": fuliza_used_total,
+            "fuliza_used_count": kpis.fuliza_count or 0,
+            "fuliza_repaid_total": round(kpis.fuliza_repaid or 0, 2),
+            "fuliza_ratio": round(fuliza_used_total / total_inflow, 4),
         }
 
+    @staticmethod
+    def _bucket_start(dialect: str, bucket: str):
+        """The first day of DailyRollup.day's bucket; weeks start on Monday."""
+        day = DailyRollup.day
+        if bucket == "day":
+            return day
+        if dialect == "sqlite":
+            if bucket == "week":
+                return func.date(day, "weekday 0", "-6 days", type_=Date)
+            return func.date(day, "start of month", type_=Date)
+        return cast(func.date_trunc(bucket, cast(day, DateTime)), Date)
+
+    @staticmethod
+    def _series_from(metric, bucket, tx_type, buckets, max_points):
+        """buckets is a list of (first day, value) pairs in date order."""
+        if max_points:
+            kept = lttb_indices([day.toordinal() for day, _ in buckets],
+                                [value for _, value in buckets], max_points)
+            points = [buckets[i] for i in kept]
+        else:
+            points = buckets
+        return {
+            "metric": metric,
+            "bucket": bucket,
+            "type": tx_type,
+            "buckets": len(buckets),
+            "points": [{"date": str(day), "value": round(value, 2)} for day, value in points],
+        }
+
+    # ── Public API ────────────────────────────────────────────────────────────
+    def summary(self):
+        """Returns 6 KPI fields for the dashboard."""
+        return self._summary_from(self._kpis(self.session, self.user_id))
+
     def spending_by_category(self):
         """Returns spending grouped by transaction type."""
-        session = SessionLocal()
-        results = session.query(
-            Transaction.type,
-            func.sum(Transaction.amount).label("total"),
-            func.count(Transaction.id).label("count")
-        ).filter(Transaction.amount < 0).group_by(Transaction.type).all()
-        session.close()
+        results = self._categories_query(self.session, self.user_id).all()
         return [
             {"type": r.type, "total": round(r.total, 2), "count": r.count}
             for r in results
@@ -59,11 +133,9 @@ class AnalyticsService:
 
     def top_transactions(self, limit=10):
         """Returns the largest single expenditures."""
-        session = SessionLocal()
-        results = session.query(Transaction).filter(
-            Transaction.amount < 0
+        results = self.session.query(Transaction).filter(
+            Transaction.user_id == self.user_id, Transaction.amount < 0
         ).order_by(Transaction.amount.asc()).limit(limit).all()
-        session.close()
         return [
             {"transaction_code": t.transaction_code, "date": str(t.date),
              "type": t.type, "amount": t.amount}
@@ -71,46 +143,131 @@ class AnalyticsService:
         ]
 
     def fuliza_usage(self):
-        """Returns full Fuliza analytics including repaid, ratio, and timeline."""
-        session = SessionLocal()
+        """Returns Fuliza used, count, repaid and ratio to income; the timeline is time_series("fuliza")."""
+        return self._fuliza_from(self._kpis(self.session, self.user_id))
 
-        used = session.query(
-            func.sum(Transaction.fuliza_used).label("total"),
-            func.count(Transaction.id).label("count")
-        ).filter(Transaction.fuliza_used > 0).first()
-
-        fuliza_used_total = round(used.total or 0, 2)
-        fuliza_used_count = used.count or 0
-
-        fuliza_repaid_total = round(
-            session.query(
-                func.sum(func.abs(Transaction.amount))
-            ).filter(Transaction.type == "Fuliza Repayment").scalar() or 0, 2
+    def time_series(self, metric="outflow", bucket="day", tx_type=None, start=None, end=None,
+                    max_points=None):
+        """
+        metric (inflow, outflow, net or fuliza) per day, week or month, from
+        the rollups; only buckets with matching transactions appear. tx_type
+        narrows it to one category. With max_points, longer series are
+        downsampled with LTTB; "buckets" is the length before that.
+        """
+        start, end = series_args(metric, bucket, start, end)
+        value, count = self.SERIES_METRICS[metric]
+        day = self._bucket_start(self.session.get_bind().dialect.name, bucket).label("day")
+        query = self.session.query(day, func.sum(value).label("value")).filter(
+            DailyRollup.user_id == self.user_id, count > 0
         )
+        if tx_type:
+            query = query.filter(DailyRollup.type == tx_type)
+        if start:
+            query = query.filter(DailyRollup.day >= start)
+        if end:
+            query = query.filter(DailyRollup.day <= end)
+        rows = query.group_by(day).order_by(day).all()
+        return self._series_from(metric, bucket, tx_type, [(r.day, r.value) for r in rows], max_points)
 
-        total_inflow = session.query(
-            func.sum(Transaction.amount)
-        ).filter(Transaction.amount > 0).scalar() or 1  # avoid div-by-zero
+    def dashboard(self, top_limit=5):
+        """
+        Everything the dashboard shows, in two round trips: the KPI pass,
+        and one UNION ALL for categories and top expenses. Numbers match summary(), spending_by_category(),
+        top_transactions() and fuliza_usage().
+        """
+        session, user_id = self.session, self.user_id
+        kpis = self._kpis(session, user_id)
 
-        fuliza_ratio = round(fuliza_used_total / total_inflow, 4)
+        # One row shape for both lists; "kind" says which list a row belongs to
+        categories = self._categories_query(session, user_id).subquery()
+        category_rows = session.query(
+            literal("category").label("kind"),
+            cast(null(), String).label("code"),
+            categories.c.type.label("type"),
+            cast(null(), DateTime).label("ts"),
+            cast(categories.c.total, Float).label("total"),
+            cast(categories.c.count, Integer).label("count"),
+        )
 
-        # Timeline: daily fuliza usage
-        timeline_rows = session.query(
-            func.date(Transaction.date).label("day"),
-            func.sum(Transaction.fuliza_used).label("value")
+        top = session.query(
+            Transaction.transaction_code, Transaction.type, Transaction.date, Transaction.amount
         ).filter(
-            Transaction.fuliza_used > 0
-        ).group_by(func.date(Transaction.date)).order_by("day").all()
+            Transaction.user_id == user_id, Transaction.amount < 0
+        ).order_by(Transaction.amount.asc()).limit(top_limit).subquery()
+        top_rows = session.query(
+            literal("top"), top.c.transaction_code, top.c.type, top.c.date,
+            top.c.amount, cast(null(), Integer),
+        )
 
-        session.close()
+        rows = category_rows.union_all(top_rows).all()
+
+        top_expenses = sorted((r for r in rows if r.kind == "top"), key=lambda r: r.total)
 
         return {
-            "fuliza_used_total": fuliza_used_total,
-            "fuliza_used_count": fuliza_used_count,
-            "fuliza_repaid_total": fuliza_repaid_total,
-            "fuliza_ratio": fuliza_ratio,
-            "timeline": [
-                {"date": str(r.day), "value": round(r.value, 2)}
-                for r in timeline_rows
+            "summary": self._summary_from(kpis),
+            "categories": [
+                {"type": r.type, "total": round(r.total, 2), "count": r.count}
+                for r in rows if r.kind == "category"
+            ],
+            "top_expenses": [
+                {"transaction_code": r.code, "date": str(r.ts),
+                 "type": r.type, "amount": r.total}
+                for r in top_expenses
             ],
-        }
\ No newline at end of file
+            "fuliza": self._fuliza_from(kpis),
+        }
+
+
+def series_args(metric: str, bucket: str, start: str | None, end: str | None):
+    """Checks time_series arguments; returns start and end as dates. Raises ValueError."""
+    metrics, buckets = AnalyticsService.SERIES_METRICS, AnalyticsService.SERIES_BUCKETS
+    if metric not in metrics:
+        raise ValueError(f"Unknown metric {metric!r}: use one of {', '.join(metrics)}.")
+    if bucket not in buckets:
+        raise ValueError(f"Unknown bucket {bucket!r}: use one of {', '.join(buckets)}.")
+    start = datetime.fromisoformat(start).date() if start else None
+    end = datetime.fromisoformat(end).date() if end else None
+    return start, end
+
+
+def analytics_service(session=None, user_id: str = DEFAULT_USER_ID):
+    """AnalyticsService for user_id, or its columnar twin with ANALYTICS_BACKEND=columnar."""
+    if ANALYTICS_BACKEND == "columnar":
+        from services.columnar_analytics import ColumnarAnalyticsService
+        return ColumnarAnalyticsService(session, user_id=user_id)
+    return AnalyticsService(session, user_id=user_id)
+
+
+class AsyncAnalyticsService:
+    """
+    Awaitable AnalyticsService for async endpoints. session is an
+    AsyncSession (queries await the async driver) or a plain Session (they
+    run in the threadpool). The caller owns the session.
+    """
+
+    def __init__(self, session, user_id: str = DEFAULT_USER_ID):
+        self.session = session
+        self.user_id = user_id
+
+    async def _run(self, method: str, **kwargs):
+        return await run_with_session(
+            self.session, lambda s: getattr(analytics_service(s, self.user_id), method)(**kwargs)
+        )
+
+    async def summary(self):
+        return await self._run("summary")
+
+    async def spending_by_category(self):
+        return await self._run("spending_by_category")
+
+    async def top_transactions(self, limit=10):
+        return await self._run("top_transactions", limit=limit)
+
+    async def fuliza_usage(self):
+        return await self._run("fuliza_usage")
+
+    async def time_series(self, **kwargs):
+        return await self._run("time_series", **kwargs)
+
+    async def dashboard(self, top_limit=5):
+        return await self._run("dashboard", top_limit=top_limit)
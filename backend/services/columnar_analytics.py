@@ -0,0 +1,312 @@
+"""
+Columnar analytics
+==================
+AnalyticsService answered from in-memory column arrays instead of SQL;
+selected with ANALYTICS_BACKEND=columnar (see services/analytics.py).
+
+Each user's transactions are loaded once into NumPy arrays: dates as
+datetime64[us] (int64 underneath), types dictionary-encoded as small ints,
+amounts and Fuliza as float64. After an import bumps the user's data
+generation, the next query appends just the rows with higher ids, so the
+arrays are never reloaded from scratch. Summary, categories, top-N and the
+time series are vectorized kernels over those arrays (bincount,
+argpartition, unique) with no ORM or SQL round trip.
+
+The generations live in the database, so each worker's store sees every
+worker's imports (and `python -m database.rollups` after a hand edit).
+Users are evicted least recently used first once COLUMN_STORE_MAX_ROWS
+rows are held.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy import String, func, select, type_coerce
+
+from database import generation
+from database.models import Transaction
+from database.session import SessionLocal
+from database.tenancy import DEFAULT_USER_ID
+from services.analytics import AnalyticsService, series_args
+
+# Most transactions kept in memory, over all users
+COLUMN_STORE_MAX_ROWS = int(os.getenv("COLUMN_STORE_MAX_ROWS", "5000000"))
+
+
+def _load_columns(dialect: str):
+    # SQLite stores dates as ISO text; NumPy parses it far faster than the
+    # DateTime type's per-row conversion
+    date = type_coerce(Transaction.date, String) if dialect == "sqlite" else Transaction.date
+    return (
+        Transaction.id, Transaction.transaction_code, date,
+        Transaction.type, Transaction.amount, Transaction.fuliza_used,
+    )
+
+
+class UserColumns:
+    """One user's transactions as parallel arrays, in id order. Replaced, never mutated."""
+
+    def __init__(self, ids, codes, dates, types, amounts, fuliza):
+        self.ids = ids
+        self.codes = codes
+        self.dates = dates
+        self.types = types
+        self.amounts = amounts
+        self.fuliza = fuliza
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def last_id(self) -> int:
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    def extended(self, other: "UserColumns") -> "UserColumns":
+        return UserColumns(*(
+            np.concatenate([mine, theirs])
+            for mine, theirs in zip(self._arrays(), other._arrays())
+        ))
+
+    def _arrays(self):
+        return self.ids, self.codes, self.dates, self.types, self.amounts, self.fuliza
+
+
+class _Entry:
+    def __init__(self):
+        self.columns = None
+        self.generation = -1
+        self.lock = threading.Lock()
+
+
+class ColumnStore:
+    """Per-user UserColumns, kept current with the data generation."""
+
+    def __init__(self, max_rows: int = COLUMN_STORE_MAX_ROWS):
+        self.max_rows = max_rows
+        self.loads = 0
+        self.appends = 0
+        self.evicted = 0
+        self.type_names = []
+        self._type_codes = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _encode_types(self, names) -> np.ndarray:
+        with self._lock:
+            for name in set(names) - self._type_codes.keys():
+                self._type_codes[name] = len(self.type_names)
+                self.type_names.append(name)
+            codes = self._type_codes
+            return np.fromiter((codes[name] for name in names), dtype=np.int16, count=len(names))
+
+    def _fetch(self, session, user_id: str, after_id: int) -> UserColumns:
+        connection = session.connection()
+        rows = connection.execute(
+            select(*_load_columns(connection.dialect.name))
+            .where(Transaction.user_id == user_id, Transaction.id > after_id)
+            .order_by(Transaction.id)
+        ).all()
+        ids, codes, dates, types, amounts, fuliza = zip(*rows) if rows else ((),) * 6
+        return UserColumns(
+            np.array(ids, dtype=np.int64),
+            np.array(codes, dtype=object),
+            np.array(dates, dtype="datetime64[us]"),
+            self._encode_types(types),
+            np.array(amounts, dtype=np.float64),
+            np.nan_to_num(np.array(fuliza, dtype=np.float64)),
+        )
+
+    @staticmethod
+    def _count(session, user_id: str) -> int:
+        return session.execute(
+            select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id)
+        ).scalar()
+
+    def _entry(self, user_id: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = self._entries[user_id] = _Entry()
+            self._entries.move_to_end(user_id)
+            return entry
+
+    def _evict(self):
+        with self._lock:
+            held = sum(len(e.columns) for e in self._entries.values() if e.columns is not None)
+            while held > self.max_rows and len(self._entries) > 1:
+                _, entry = self._entries.popitem(last=False)
+                if entry.columns is not None:
+                    held -= len(entry.columns)
+                    self.evicted += 1
+
+    def columns(self, session, user_id: str) -> UserColumns:
+        """user_id's columns, loading them or appending newly imported rows as needed."""
+        entry = self._entry(user_id)
+        gen = generation.current(session, user_id)
+        if entry.generation == gen:
+            return entry.columns
+
+        with entry.lock:
+            if entry.generation != gen:
+                if entry.columns is None:
+                    entry.columns = self._fetch(session, user_id, 0)
+                    self.loads += 1
+                else:
+                    columns = entry.columns.extended(self._fetch(session, user_id, entry.columns.last_id))
+                    self.appends += 1
+                    if len(columns) != self._count(session, user_id):
+                        # On PostgreSQL an import that took its ids first can
+                        # commit last, below last_id; start over
+                        columns = self._fetch(session, user_id, 0)
+                        self.loads += 1
+                    entry.columns = columns
+                entry.generation = gen
+            columns = entry.columns
+        self._evict()
+        return columns
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._entries),
+                "rows": sum(len(e.columns) for e in self._entries.values() if e.columns is not None),
+                "max_rows": self.max_rows,
+                "loads": self.loads,
+                "appends": self.appends,
+                "evicted": self.evicted,
+            }
+
+
+# ── Shared store used by ColumnarAnalyticsService ────────────────────────────
+column_store = ColumnStore()
+
+
+class ColumnarAnalyticsService:
+    """
+    AnalyticsService's interface and results, computed from column_store.
+    The session is only used to read the user's data generation and to
+    load and append rows.
+    """
+
+    def __init__(self, session=None, user_id: str = DEFAULT_USER_ID, store: ColumnStore = None):
+        self._owns_session = session is None
+        self.session = SessionLocal() if session is None else session
+        self.user_id = user_id
+        self.store = store or column_store
+
+    def close(self):
+        if self._owns_session:
+            self.session.close()
+
+    def _columns(self) -> UserColumns:
+        return self.store.columns(self.session, self.user_id)
+
+    def _type_code(self, name: str) -> int:
+        try:
+            return self.store.type_names.index(name)
+        except ValueError:
+            return -1
+
+    # ── Kernels ───────────────────────────────────────────────────────────────
+    def _kpis(self, c: UserColumns):
+        """The KPI row AnalyticsService._kpis reads from the rollups."""
+        amounts = c.amounts
+        used = c.fuliza > 0
+        moved = np.abs(amounts)
+        return SimpleNamespace(
+            inflow=float(amounts[amounts > 0].sum()),
+            outflow=float(amounts[amounts < 0].sum()),
+            fuliza_used=float(c.fuliza[used].sum()),
+            fuliza_count=int(used.sum()),
+            fuliza_repaid=float(moved[c.types == self._type_code("Fuliza Repayment")].sum()),
+            merchant_spend=float(moved[c.types == self._type_code("Merchant Payment")].sum()),
+        )
+
+    def _categories(self, c: UserColumns):
+        outflow = c.amounts < 0
+        n_types = len(self.store.type_names)
+        totals = np.bincount(c.types[outflow], weights=c.amounts[outflow], minlength=n_types)
+        counts = np.bincount(c.types[outflow], minlength=n_types)
+        return sorted(
+            ({"type": self.store.type_names[code], "total": round(float(totals[code]), 2),
+              "count": int(counts[code])}
+             for code in np.flatnonzero(counts)),
+            key=lambda category: category["type"],
+        )
+
+    def _top(self, c: UserColumns, limit: int):
+        spent = np.flatnonzero(c.amounts < 0)
+        if len(spent) > limit:
+            spent = spent[np.argpartition(c.amounts[spent], limit - 1)[:limit]]
+        spent = spent[np.argsort(c.amounts[spent], kind="stable")]
+        return [
+            {"transaction_code": c.codes[i], "date": str(c.dates[i].item()),
+             "type": self.store.type_names[c.types[i]], "amount": float(c.amounts[i])}
+            for i in spent
+        ]
+
+    def _series(self, c: UserColumns, metric: str, bucket: str, tx_type, start, end):
+        """(first day, value) per bucket, as AnalyticsService.time_series reads them from the rollups."""
+        if metric == "inflow":
+            rows, values = c.amounts > 0, c.amounts
+        elif metric == "outflow":
+            rows, values = c.amounts < 0, -c.amounts
+        elif metric == "net":
+            rows, values = np.ones(len(c), dtype=bool), c.amounts
+        else:
+            rows, values = c.fuliza > 0, c.fuliza
+        days = c.dates.astype("datetime64[D]")
+        if tx_type:
+            rows = rows & (c.types == self._type_code(tx_type))
+        if start:
+            rows = rows & (days >= np.datetime64(start, "D"))
+        if end:
+            rows = rows & (days <= np.datetime64(end, "D"))
+        if not rows.any():
+            return []
+
+        days = days[rows]
+        if bucket == "week":
+            # datetime64 weeks start on Thursday (1970-01-01); shift them to Monday
+            monday = np.timedelta64(4, "D")
+            days = (days - monday).astype("datetime64[W]").astype("datetime64[D]") + monday
+        elif bucket == "month":
+            days = days.astype("datetime64[M]").astype("datetime64[D]")
+        offsets = days.view(np.int64)
+        first = offsets.min()
+        totals = np.bincount(offsets - first, weights=values[rows])
+        present = np.flatnonzero(np.bincount(offsets - first))
+        starts = (first + present).astype("datetime64[D]").tolist()
+        return list(zip(starts, totals[present].tolist()))
+
+    # ── Public API (same as AnalyticsService) ───────────────────────────────
+    def summary(self):
+        return AnalyticsService._summary_from(self._kpis(self._columns()))
+
+    def spending_by_category(self):
+        return self._categories(self._columns())
+
+    def top_transactions(self, limit=10):
+        return self._top(self._columns(), limit)
+
+    def fuliza_usage(self):
+        return AnalyticsService._fuliza_from(self._kpis(self._columns()))
+
+    def time_series(self, metric="outflow", bucket="day", tx_type=None, start=None, end=None,
+                    max_points=None):
+        start, end = series_args(metric, bucket, start, end)
+        buckets = self._series(self._columns(), metric, bucket, tx_type, start, end)
+        return AnalyticsService._series_from(metric, bucket, tx_type, buckets, max_points)
+
+    def dashboard(self, top_limit=5):
+        c = self._columns()
+        kpis = self._kpis(c)
+        return {
+            "summary": AnalyticsService._summary_from(kpis),
+            "categories": self._categories(c),
+            "top_expenses": self._top(c, top_limit),
+            "fuliza": AnalyticsService._fuliza_from(kpis),
+        }
@@ -0,0 +1,48 @@
+"""
+Downsampling
+============
+Largest-Triangle-Three-Buckets (LTTB, Steinarsson 2013): picks max_points
+of a series that keep its visual shape. The first and last points are
+always kept; the points between are split into max_points - 2 equal
+buckets and from each the one forming the largest triangle with the point
+kept before it and the average of the next bucket is kept, so spikes
+survive where plain striding or averaging would flatten them.
+
+Series here are at most one point per day, so this is plain Python.
+"""
+
+
+def lttb_indices(xs, ys, max_points: int) -> list[int]:
+    """
+    Indices of the points to keep, in order. xs must be increasing.
+    Everything is kept when there are no more than max_points points.
+    """
+    n = len(xs)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3.")
+    if n <= max_points:
+        return list(range(n))
+
+    every = (n - 2) / (max_points - 2)
+    kept = [0]
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # The next bucket's average point; for the last bucket, the last point
+        next_end = min(int((i + 2) * every) + 1, n)
+        next_xs, next_ys = xs[end:next_end], ys[end:next_end]
+        cx = sum(next_xs) / len(next_xs)
+        cy = sum(next_ys) / len(next_ys)
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - cx) * (ys[j] - ay) - (ax - xs[j]) * (cy - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from database.repository import TransactionRepository
+from database.tenancy import DEFAULT_USER_ID
+
+# Worker threads running imports, and how many finished jobs we remember
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+MAX_FINISHED_JOBS = 100
+
+
+class IngestJob:
+    """Progress of one uploaded statement as it is parsed and imported for a user."""
+
+    def __init__(self, filename: str, pages_total: int, user_id: str = DEFAULT_USER_ID):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.filename = filename
+        self.stage = "queued"  # queued → importing → done | failed
+        self.pages_total = pages_total
+        self.pages_processed = 0
+        self.transactions_processed = 0
+        self.imported = 0
+        self.skipped = 0
+        self.cached = False
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in ("done", "failed")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "stage": self.stage,
+            "pages_total": self.pages_total,
+            "pages_processed": self.pages_processed,
+            "transactions_processed": self.transactions_processed,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "cached": self.cached,
+            "error": self.error,
+        }
+
+
+class IngestJobManager:
+    """Runs statement imports on a thread pool, off the event loop."""
+
+    def __init__(self, max_workers: int = INGEST_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: str, filename: str, password: str = None, pages_total: int = 0,
+               user_id: str = DEFAULT_USER_ID) -> IngestJob:
+        """
+        Queue an import of file_path into user_id's transactions. The job
+        owns the file and deletes it once the import finishes.
+        """
+        job = IngestJob(filename, pages_total, user_id)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ingest"
+                )
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, file_path, password)
+        return job
+
+    def get(self, job_id: str, user_id: str = DEFAULT_USER_ID) -> IngestJob | None:
+        """user_id's job job_id; None if there is none (or it is someone else's)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None and job.user_id == user_id else None
+
+    def recent(self, user_id: str = DEFAULT_USER_ID) -> list[IngestJob]:
+        with self._lock:
+            return [job for job in reversed(self._jobs.values()) if job.user_id == user_id]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestJob, file_path: str, password: str = None):
+        from helpers.statement_cache import statement_cache
+
+        def page_done():
+            job.pages_processed += 1
+
+        repo = TransactionRepository(user_id=job.user_id)
+        try:
+            job.stage = "importing"
+            batches, job.cached = statement_cache.iter_batches(file_path, password, on_page=page_done)
+            if job.cached:
+                job.pages_processed = job.pages_total
+            for batch in batches:
+                imported, skipped = repo.add_bulk(batch)
+                job.imported += imported
+                job.skipped += skipped
+                job.transactions_processed += len(batch)
+            job.stage = "done"
+        except Exception as e:
+            job.error = f"Failed to process file: {e}"
+            job.stage = "failed"
+        finally:
+            job.finished_at = time.time()
+            repo.close()
+            os.unlink(file_path)
+
+
+# ── Shared manager used by the API ───────────────────────────────────────────
+ingest_jobs = IngestJobManager()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+
+# Most analytics responses kept in memory at once
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of analytics results, keyed by endpoint, parameters
+    (which include the user) and that user's data generation. Entries from older generations are never hit again
+    and simply age out of the LRU. Hits and misses are also counted per
+    endpoint.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._endpoint_hits = Counter()
+        self._endpoint_misses = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(endpoint: str, params: dict, gen: int) -> str:
+        """Weak ETag for a response; the same in every worker, since gen is stored in the database."""
+        digest = hashlib.sha1(json.dumps([endpoint, params], sort_keys=True).encode()).hexdigest()[:16]
+        return f'W/"{gen}-{digest}"'
+
+    _MISS = object()
+
+    def _lookup(self, key):
+        endpoint = key[0]
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._endpoint_hits[endpoint] += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+            self._endpoint_misses[endpoint] += 1
+            return self._MISS
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, endpoint: str, params: dict, gen: int, compute):
+        key = (endpoint, json.dumps(params, sort_keys=True), gen)
+        value = self._lookup(key)
+        if value is self._MISS:
+            value = compute()
+            self._store(key, value)
+        return value
+
+    async def get_or_compute_async(self, endpoint: str, params: dict, gen: int, compute):
+        """get_or_compute for a compute() that returns an awaitable."""
+        key = (endpoint, json.dumps(params, sort_keys=True), gen)
+        value = self._lookup(key)
+        if value is self._MISS:
+            value = await compute()
+            self._store(key, value)
+        return value
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    @staticmethod
+    def _hit_rate(hits: int, misses: int) -> float:
+        return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self._endpoint_hits) | set(self._endpoint_misses))
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self._hit_rate(self.hits, self.misses),
+                "by_endpoint": {
+                    endpoint: {
+                        "hits": self._endpoint_hits[endpoint],
+                        "misses": self._endpoint_misses[endpoint],
+                        "hit_rate": self._hit_rate(self._endpoint_hits[endpoint], self._endpoint_misses[endpoint]),
+                    }
+                    for endpoint in endpoints
+                },
+                "not_modified": self.not_modified,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# ── Shared cache used by the API ─────────────────────────────────────────────
+response_cache = ResponseCache()
@@ -1,10 +1,18 @@
 import json
 import re
 from langchain_core.tools import tool
-from services.analytics import AnalyticsService
+from database.session import SessionLocal
+from database.tenancy import current_user
+from services.analytics import analytics_service
+from tools.tool_cache import memoized
+
+
+@memoized
+def _fuliza_usage() -> str:
+    with SessionLocal() as session:
+        result = analytics_service(session, current_user()).fuliza_usage()
+    return json.dumps(result, indent=2)
 
-# ── Create a shared analytics instance ───────────────────────────────────────
-analytics = AnalyticsService()
 
 @tool
 def get_fuliza_usage(query: str = "") -> str:
@@ -13,5 +21,4 @@ def get_fuliza_usage(query: str = "") -> str:
     Use this to assess the user's reliance on overdraft credit.
     Pass any string as input (it is ignored).
     """
-    result = analytics.fuliza_usage()
-    return json.dumps(result, indent=2)
\ No newline at end of file
+    return _fuliza_usage()
\ No newline at end of file
@@ -1,10 +1,18 @@
 import json
 import re
 from langchain_core.tools import tool
-from services.analytics import AnalyticsService
+from database.session import SessionLocal
+from database.tenancy import current_user
+from services.analytics import analytics_service
+from tools.tool_cache import memoized
+
+
+@memoized
+def _spending_by_category() -> str:
+    with SessionLocal() as session:
+        result = analytics_service(session, current_user()).spending_by_category()
+    return json.dumps(result, indent=2)
 
-# ── Create a shared analytics instance ───────────────────────────────────────
-analytics = AnalyticsService()
 
 @tool
 def get_spending_by_category(query: str = "") -> str:
@@ -14,5 +22,4 @@ def get_spending_by_category(query: str = "") -> str:
     Use this to identify where the user spends the most money.
     Pass any string as input (it is ignored).
     """
-    result = analytics.spending_by_category()
-    return json.dumps(result, indent=2)
\ No newline at end of file
+    return _spending_by_category()
\ No newline at end of file
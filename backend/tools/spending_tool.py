@@ -1,10 +1,18 @@
 import json
 import re
 from langchain_core.tools import tool
-from services.analytics import AnalyticsService
+from database.session import SessionLocal
+from database.tenancy import current_user
+from services.analytics import analytics_service
+from tools.tool_cache import memoized
+
+
+@memoized
+def _spending_summary() -> str:
+    with SessionLocal() as session:
+        result = analytics_service(session, current_user()).summary()
+    return json.dumps(result, indent=2)
 
-# ── Create a shared analytics instance ───────────────────────────────────────
-analytics = AnalyticsService()
 
 @tool
 def get_spending_summary(query: str = "") -> str:
@@ -13,5 +21,4 @@ def get_spending_summary(query: str = "") -> str:
     Use this to give the user an overview of their financial position.
     Pass any string as input (it is ignored).
     """
-    result = analytics.summary()
-    return json.dumps(result, indent=2)
+    return _spending_summary()
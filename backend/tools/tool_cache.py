@@ -0,0 +1,34 @@
+import functools
+import os
+
+from database import generation
+from database.session import SessionLocal
+from database.tenancy import current_user
+from services.response_cache import ResponseCache
+
+# Most tool results kept in memory at once
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "64"))
+
+# Shared by every agent session; an entry goes stale as soon as an import
+# bumps its user's data generation.
+tool_cache = ResponseCache(max_entries=TOOL_CACHE_MAX_ENTRIES)
+
+
+def memoized(fn):
+    """
+    Cache fn's result per arguments, user (current_user(), which fn reads
+    too) and data generation in tool_cache, so asking again costs no
+    database work until new transactions arrive. Only memoize functions
+    whose result depends on nothing else.
+    """
+    name = fn.__name__.lstrip("_")
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        user_id = current_user()
+        params = {"args": args, "kwargs": kwargs, "user_id": user_id}
+        with SessionLocal() as session:
+            gen = generation.current(session, user_id)
+        return tool_cache.get_or_compute(name, params, gen, lambda: fn(*args, **kwargs))
+
+    return wrapper
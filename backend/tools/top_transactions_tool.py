@@ -1,10 +1,17 @@
 import json
 import re
 from langchain_core.tools import tool
-from services.analytics import AnalyticsService
+from database.session import SessionLocal
+from database.tenancy import current_user
+from services.analytics import analytics_service
+from tools.tool_cache import memoized
 
-# ── Create a shared analytics instance ───────────────────────────────────────
-analytics = AnalyticsService()
+
+@memoized
+def _top_transactions(limit: int) -> str:
+    with SessionLocal() as session:
+        result = analytics_service(session, current_user()).top_transactions(limit=limit)
+    return json.dumps(result, indent=2)
 
 
 @tool
@@ -14,5 +21,4 @@ def get_top_transactions(query: str = "") -> str:
     Use this to highlight big spending moments to the user.
     Pass any string as input (it is ignored).
     """
-    result = analytics.top_transactions(limit=10)
-    return json.dumps(result, indent=2)
\ No newline at end of file
+    return _top_transactions(limit=10)
\ No newline at end of file
@@ -33,12 +33,15 @@ export interface Transaction {
   amount: number;
   balance: number;
   fuliza_used: number;
+  description: string | null;
+  counterparty: string | null;
 }
 
 export interface TransactionsPage {
   total: number;
-  page: number;
+  page: number | null;
   page_size: number;
+  next_cursor: string | null;
   data: Transaction[];
 }
 
@@ -54,7 +57,30 @@ export interface FulizaData {
   fuliza_used_count: number;
   fuliza_repaid_total: number;
   fuliza_ratio: number;
-  timeline: { date: string; value: number }[];
+}
+
+export interface TimeSeriesParams {
+  metric?: 'inflow' | 'outflow' | 'net' | 'fuliza';
+  bucket?: 'day' | 'week' | 'month';
+  type?: string;
+  start?: string;
+  end?: string;
+  max_points?: number;
+}
+
+export interface TimeSeries {
+  metric: string;
+  bucket: string;
+  type: string | null;
+  buckets: number;
+  points: { date: string; value: number }[];
+}
+
+export interface DashboardData {
+  summary: Summary;
+  categories: CategoryRow[];
+  top_expenses: TopExpense[];
+  fuliza: FulizaData;
 }
 
 export interface UploadResult {
@@ -63,13 +89,59 @@ export interface UploadResult {
   message: string;
 }
 
+export interface UploadJob {
+  job_id: string;
+  filename: string;
+  stage: 'queued' | 'importing' | 'done' | 'failed';
+  pages_total: number;
+  pages_processed: number;
+  transactions_processed: number;
+  imported: number;
+  skipped: number;
+  error: string | null;
+}
+
 export interface ChatResponse {
   answer: string;
+  session_id: string;
+}
+
+export interface ChatStreamHandlers {
+  onSession?: (sessionId: string) => void;
+  onTool?: (name: string) => void;
+  onToken?: (text: string) => void;
+}
+
+/** Read a text/event-stream response, calling onEvent for each event. */
+async function readEvents(res: Response, onEvent: (event: string, data: Record<string, string>) => void) {
+  const reader = res.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end: number;
+    while ((end = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      onEvent(event, data ? JSON.parse(data) : {});
+    }
+  }
 }
 
 /* ── Endpoints ─────────────────────────────────────────────────────── */
 
 export const api = {
+  getDashboard: (topLimit = 5) =>
+    request<DashboardData>(`/api/dashboard?top_limit=${topLimit}`),
+
   getSummary: () => request<Summary>('/api/summary'),
 
   getCategories: () => request<CategoryRow[]>('/api/categories'),
@@ -87,17 +159,77 @@ export const api = {
 
   getFuliza: () => request<FulizaData>('/api/fuliza'),
 
-  upload: async (file: File, password?: string): Promise<UploadResult> => {
+  getTimeSeries: (params: TimeSeriesParams) => {
+    const qs = new URLSearchParams();
+    Object.entries(params).forEach(([k, v]) => {
+      if (v !== '' && v !== undefined && v !== null) qs.set(k, String(v));
+    });
+    return request<TimeSeries>(`/api/timeseries?${qs}`);
+  },
+
+  getJob: (jobId: string) => request<UploadJob>(`/api/jobs/${jobId}`),
+
+  upload: async (
+    file: File,
+    password?: string,
+    onProgress?: (job: UploadJob) => void,
+  ): Promise<UploadResult> => {
     const fd = new FormData();
     fd.append('file', file);
     if (password) fd.append('password', password);
-    return request<UploadResult>('/api/upload', { method: 'POST', body: fd });
+    let job = await request<UploadJob>('/api/upload', { method: 'POST', body: fd });
+
+    // The import runs in the background — poll until it finishes
+    while (job.stage !== 'done' && job.stage !== 'failed') {
+      onProgress?.(job);
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      job = await api.getJob(job.job_id);
+    }
+    if (job.stage === 'failed') {
+      throw new Error(JSON.stringify({ detail: job.error }));
+    }
+    return {
+      imported: job.imported,
+      skipped: job.skipped,
+      message: `Successfully processed ${job.filename}. ` +
+        `${job.imported} new transactions imported, ${job.skipped} duplicates skipped.`,
+    };
   },
 
-  chat: (message: string) =>
+  chat: (message: string, sessionId?: string | null) =>
     request<ChatResponse>('/api/chat', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ message }),
+      body: JSON.stringify({ message, session_id: sessionId ?? null }),
     }),
+
+  /** Like chat(), but relays answer tokens as they are generated. */
+  chatStream: async (
+    message: string,
+    sessionId: string | null,
+    handlers: ChatStreamHandlers = {},
+  ): Promise<ChatResponse> => {
+    const res = await fetch(`${BASE}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ message, session_id: sessionId }),
+    });
+    if (!res.ok || !res.body) {
+      throw new Error((await res.text()) || res.statusText);
+    }
+    let result: ChatResponse | null = null;
+    let error: string | null = null;
+    await readEvents(res, (event, data) => {
+      if (event === 'session') handlers.onSession?.(data.session_id);
+      else if (event === 'tool') handlers.onTool?.(data.name);
+      else if (event === 'token') handlers.onToken?.(data.text);
+      else if (event === 'done') result = { answer: data.answer, session_id: data.session_id };
+      else if (event === 'error') error = data.detail;
+    });
+    if (!result) throw new Error(error || 'Chat stream ended early.');
+    return result;
+  },
+
+  endChat: (sessionId: string) =>
+    request<{ session_id: string; discarded: boolean }>(`/api/chat/${sessionId}`, { method: 'DELETE' }),
 };
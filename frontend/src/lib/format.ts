@@ -17,6 +17,15 @@ export function fmtDate(iso: string): string {
   });
 }
 
+/** Format ISO date string to its month and year. */
+export function fmtMonth(iso: string): string {
+  const d = new Date(iso);
+  return d.toLocaleDateString('en-KE', {
+    year: 'numeric',
+    month: 'short',
+  });
+}
+
 /** Format ISO date string to a readable date + time. */
 export function fmtDateTime(iso: string): string {
   const d = new Date(iso);
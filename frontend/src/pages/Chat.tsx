@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from 'react';
-import { Send, Bot, User, Eye, EyeOff } from 'lucide-react';
+import { Send, Bot, User, Eye, EyeOff, RotateCcw } from 'lucide-react';
 import { api } from '../lib/api';
 
 interface Message {
@@ -15,16 +15,34 @@ const SUGGESTED = [
   'Show spending by category',
 ];
 
+// The server keeps one conversation per session id; remember it for this tab
+const SESSION_KEY = 'chatSessionId';
+
 export default function Chat() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
   const [hideReasoning, setHideReasoning] = useState(true);
+  const [sessionId, setSessionId] = useState<string | null>(() => sessionStorage.getItem(SESSION_KEY));
+  const [partial, setPartial] = useState('');
+  const [tool, setTool] = useState<string | null>(null);
   const bottomRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
     bottomRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages, loading]);
+  }, [messages, loading, partial]);
+
+  const rememberSession = (id: string) => {
+    setSessionId(id);
+    sessionStorage.setItem(SESSION_KEY, id);
+  };
+
+  const newChat = () => {
+    if (sessionId) api.endChat(sessionId).catch(() => {});
+    sessionStorage.removeItem(SESSION_KEY);
+    setSessionId(null);
+    setMessages([]);
+  };
 
   const send = async (text: string) => {
     if (!text.trim() || loading) return;
@@ -33,9 +51,18 @@ export default function Chat() {
     setMessages((prev) => [...prev, userMsg]);
     setInput('');
     setLoading(true);
+    setPartial('');
+    setTool(null);
 
     try {
-      const res = await api.chat(text.trim());
+      // Tokens of the answer arrive as they are generated; the final
+      // answer replaces them once the agent is done
+      const res = await api.chatStream(text.trim(), sessionId, {
+        onSession: rememberSession,
+        onTool: setTool,
+        onToken: (t) => setPartial((prev) => prev + t),
+      });
+      rememberSession(res.session_id);
       let answer = res.answer;
 
       // Optionally strip reasoning blocks (text between <think>...</think> or similar)
@@ -52,6 +79,8 @@ export default function Chat() {
       ]);
     } finally {
       setLoading(false);
+      setPartial('');
+      setTool(null);
     }
   };
 
@@ -67,14 +96,25 @@ export default function Chat() {
           <h2>Ask AI About Your Spending</h2>
           <p>Get insights and advice from your financial data</p>
         </div>
-        <button
-          className="btn btn-secondary"
-          onClick={() => setHideReasoning(!hideReasoning)}
-          style={{ fontSize: 12, padding: '6px 12px' }}
-        >
-          {hideReasoning ? <EyeOff size={14} /> : <Eye size={14} />}
-          {hideReasoning ? 'Show Reasoning' : 'Hide Reasoning'}
-        </button>
+        <div style={{ display: 'flex', gap: 8 }}>
+          <button
+            className="btn btn-secondary"
+            onClick={newChat}
+            disabled={loading || messages.length === 0}
+            style={{ fontSize: 12, padding: '6px 12px' }}
+          >
+            <RotateCcw size={14} />
+            New Chat
+          </button>
+          <button
+            className="btn btn-secondary"
+            onClick={() => setHideReasoning(!hideReasoning)}
+            style={{ fontSize: 12, padding: '6px 12px' }}
+          >
+            {hideReasoning ? <EyeOff size={14} /> : <Eye size={14} />}
+            {hideReasoning ? 'Show Reasoning' : 'Hide Reasoning'}
+          </button>
+        </div>
       </div>
 
       {/* Messages */}
@@ -131,7 +171,16 @@ export default function Chat() {
               <Bot size={16} />
             </div>
             <div className="chat-bubble assistant">
-              <div className="spinner" style={{ width: 18, height: 18 }} />
+              {partial || (
+                <div style={{ display: 'flex', gap: 8, alignItems: 'center' }}>
+                  <div className="spinner" style={{ width: 18, height: 18 }} />
+                  {tool && (
+                    <span style={{ fontSize: 13, color: 'var(--color-text-secondary)' }}>
+                      Looking up {tool.replace(/^get_/, '').replace(/_/g, ' ')}…
+                    </span>
+                  )}
+                </div>
+              )}
             </div>
           </div>
         )}
@@ -18,11 +18,11 @@ export default function Dashboard() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    Promise.all([api.getSummary(), api.getCategories(), api.getTopExpenses(5)])
-      .then(([s, c, t]) => {
-        setSummary(s);
-        setCategories(c);
-        setTopExpenses(t);
+    api.getDashboard(5)
+      .then((d) => {
+        setSummary(d.summary);
+        setCategories(d.categories);
+        setTopExpenses(d.top_expenses);
       })
       .finally(() => setLoading(false));
   }, []);
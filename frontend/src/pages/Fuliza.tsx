@@ -3,15 +3,24 @@ import {
   XAxis, YAxis, Tooltip, ResponsiveContainer, CartesianGrid, Area, AreaChart,
 } from 'recharts';
 import { Landmark, TrendingUp, BarChart3, Percent } from 'lucide-react';
-import { api, type FulizaData } from '../lib/api';
-import { kes, fmtDate } from '../lib/format';
+import { api, type FulizaData, type TimeSeries } from '../lib/api';
+import { kes, fmtDate, fmtMonth } from '../lib/format';
+
+// Most points the timeline chart asks for; the server downsamples longer histories
+const CHART_POINTS = 500;
 
 export default function Fuliza() {
   const [data, setData] = useState<FulizaData | null>(null);
+  const [series, setSeries] = useState<TimeSeries | null>(null);
+  const [months, setMonths] = useState<TimeSeries | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    api.getFuliza().then(setData).finally(() => setLoading(false));
+    Promise.all([
+      api.getFuliza().then(setData),
+      api.getTimeSeries({ metric: 'fuliza', bucket: 'day', max_points: CHART_POINTS }).then(setSeries),
+      api.getTimeSeries({ metric: 'fuliza', bucket: 'month' }).then(setMonths),
+    ]).finally(() => setLoading(false));
   }, []);
 
   if (loading) {
@@ -53,7 +62,7 @@ export default function Fuliza() {
       <div className="card" style={{ marginBottom: 24 }}>
         <h3 style={{ fontSize: 16, fontWeight: 700, marginBottom: 16 }}>Daily Fuliza Usage Timeline</h3>
         <ResponsiveContainer width="100%" height={300}>
-          <AreaChart data={data.timeline} margin={{ left: 10, right: 20, top: 10 }}>
+          <AreaChart data={series?.points ?? []} margin={{ left: 10, right: 20, top: 10 }}>
             <defs>
               <linearGradient id="fulizaGrad" x1="0" y1="0" x2="0" y2="1">
                 <stop offset="5%" stopColor="#f59e0b" stopOpacity={0.3} />
@@ -81,20 +90,20 @@ export default function Fuliza() {
         </ResponsiveContainer>
       </div>
 
-      {/* Daily breakdown table */}
+      {/* Monthly breakdown table: one row per month, so it stays short however long the history */}
       <div className="card">
-        <h3 style={{ fontSize: 16, fontWeight: 700, marginBottom: 16 }}>Daily Breakdown</h3>
+        <h3 style={{ fontSize: 16, fontWeight: 700, marginBottom: 16 }}>Monthly Breakdown</h3>
         <table className="data-table">
           <thead>
             <tr>
-              <th>Date</th>
+              <th>Month</th>
               <th style={{ textAlign: 'right' }}>Fuliza Used (KES)</th>
             </tr>
           </thead>
           <tbody>
-            {data.timeline.map((t) => (
+            {(months?.points ?? []).map((t) => (
               <tr key={t.date}>
-                <td>{fmtDate(t.date)}</td>
+                <td>{fmtMonth(t.date)}</td>
                 <td className="amount-negative" style={{ textAlign: 'right' }}>{kes(t.value)}</td>
               </tr>
             ))}
@@ -1,4 +1,4 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
 import { Search, Download, X } from 'lucide-react';
 import { api, type Transaction, type TransactionsPage } from '../lib/api';
 import { kes, fmtDateTime } from '../lib/format';
@@ -16,12 +16,19 @@ export default function Transactions() {
   const [maxAmt, setMaxAmt] = useState('');
   const [page, setPage] = useState(1);
   const pageSize = 15;
+  // cursors.current[n] fetches page n + 1; reset whenever the filters change
+  const cursors = useRef<string[]>(['']);
 
   // drawer
   const [selected, setSelected] = useState<Transaction | null>(null);
 
+  useEffect(() => {
+    cursors.current = [''];
+  }, [search, start, end, type, minAmt, maxAmt]);
+
   const loadData = useCallback(() => {
     setLoading(true);
+    const cursor = cursors.current[page - 1];
     api
       .getTransactions({
         q: search,
@@ -30,10 +37,14 @@ export default function Transactions() {
         type,
         min: minAmt,
         max: maxAmt,
-        page,
+        // Keyset cursor when we have one, page number otherwise
+        ...(cursor ? { cursor } : { page }),
         page_size: pageSize,
       })
-      .then(setData)
+      .then((res) => {
+        if (res.next_cursor) cursors.current[page] = res.next_cursor;
+        setData(res);
+      })
       .finally(() => setLoading(false));
   }, [search, start, end, type, minAmt, maxAmt, page]);
 
@@ -79,7 +90,7 @@ export default function Transactions() {
             <input
               className="input"
               style={{ paddingLeft: 36, maxWidth: '100%' }}
-              placeholder="Code or type…"
+              placeholder="Payee, details, code or type…"
               value={search}
               onChange={(e) => { setSearch(e.target.value); setPage(1); }}
             />
@@ -165,6 +176,8 @@ export default function Transactions() {
               ['Code', selected.transaction_code],
               ['Date', fmtDateTime(selected.date)],
               ['Type', selected.type],
+              ['Payee', selected.counterparty ?? '—'],
+              ['Details', selected.description ?? '—'],
               ['Amount', kes(selected.amount)],
               ['Balance', kes(selected.balance)],
               ['Fuliza Used', kes(selected.fuliza_used)],